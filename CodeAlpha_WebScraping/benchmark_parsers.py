@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the HTML parsing backends on saved listing pages
+
+Usage:
+    python benchmark_parsers.py [fixtures/*.html] [--repeat N]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from parsers import BACKENDS, available_parsers
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def benchmark(backend, pages, repeat):
+    """Return (records, seconds) for parsing every page ``repeat`` times
+
+    Each page is timed as the scraper runs it: build the tree, then
+    extract the books from it.
+    """
+    records = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in pages:
+            records += len(backend.extract_books(backend.build_tree(content)))
+    return records, time.perf_counter() - start
+
+
+def main():
+    """Run every installed backend over the fixtures and print records/second"""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('files', nargs='*',
+                            default=sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))))
+    arg_parser.add_argument('--repeat', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    pages = []
+    for path in args.files:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    if not pages:
+        arg_parser.error("no HTML fixtures found")
+
+    installed = available_parsers()
+    baseline = None
+    print(f"{len(pages)} page(s) x {args.repeat} repeats")
+    print(f"{'backend':<12} {'records':>8} {'seconds':>8} {'records/s':>10} {'speedup':>8}")
+
+    for name, backend in BACKENDS.items():
+        if name not in installed:
+            print(f"{name:<12} {'not installed':>38}")
+            continue
+
+        # Warm up imports and caches before timing
+        backend.extract_books(backend.build_tree(pages[0]))
+        records, seconds = benchmark(backend, pages, args.repeat)
+        rate = records / seconds
+        baseline = baseline or rate
+        print(f"{name:<12} {records:>8} {seconds:>8.3f} {rate:>10.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
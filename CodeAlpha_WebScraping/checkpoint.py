@@ -0,0 +1,85 @@
+"""
+SQLite checkpoint store for resuming interrupted crawls
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+def content_hash(content: bytes) -> str:
+    """Stable fingerprint of a downloaded page body"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class CrawlCheckpoint:
+    """Record which URLs have been fetched, parsed and written
+
+    Completions are staged with ``mark_done`` and only persisted by
+    ``commit``, which the scraper calls after the matching records have been
+    flushed to the output. A crash therefore never marks a URL as done whose
+    records were lost; at worst a page interrupted mid-write is written again
+    on resume. With ``resume=False`` any previous progress is cleared.
+    """
+
+    def __init__(self, path: str = "crawl_checkpoint.sqlite", resume: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Optional[str], int, float]] = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS completed (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                records INTEGER NOT NULL,
+                completed_at REAL NOT NULL
+            )"""
+        )
+        if not resume:
+            self._conn.execute("DELETE FROM completed")
+        self._conn.commit()
+
+    def is_done(self, url: str) -> bool:
+        """Whether ``url`` was completed in this or a previous run"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM completed WHERE url = ?", (url,)
+            ).fetchone()
+        return row is not None
+
+    def get_hash(self, url: str) -> Optional[str]:
+        """Content hash recorded for ``url``, if it was completed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM completed WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_done(self, url: str, digest: Optional[str], records: int):
+        """Stage ``url`` as completed; persisted on the next ``commit``"""
+        with self._lock:
+            self._pending.append((url, digest, records, time.time()))
+
+    def commit(self):
+        """Persist every staged completion"""
+        with self._lock:
+            if not self._pending:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO completed VALUES (?, ?, ?, ?)",
+                self._pending
+            )
+            self._conn.commit()
+            self._pending = []
+
+    def count(self) -> int:
+        """Number of persisted completed URLs"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,77 @@
+"""
+Crawl frontier with compact URL de-duplication
+"""
+
+import hashlib
+import math
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter for strings
+
+    Uses about ``-capacity * ln(error_rate) / ln(2)^2`` bits, e.g. ~3.6 MB
+    for a million URLs at a one-in-a-million false positive rate. False
+    positives are possible (a new URL reported as seen), false negatives
+    are not.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 1e-6):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Bit positions for ``item`` via double hashing of one digest"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> bool:
+        """Add ``item``, returning False if it was (probably) already present"""
+        added = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class CrawlFrontier:
+    """FIFO queue of URLs still to crawl, each admitted at most once
+
+    Every URL carries the category it was discovered under (``None`` for
+    the main catalogue). Fragments are stripped before de-duplication.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 1e-6):
+        self.seen = BloomFilter(capacity, error_rate)
+        self._queue = deque()
+
+    def add(self, url: str, category: Optional[str] = None) -> bool:
+        """Queue ``url`` unless it was seen before; returns whether it was queued"""
+        url = urldefrag(url)[0]
+        if not self.seen.add(url):
+            return False
+        self._queue.append((url, category))
+        return True
+
+    def pop_batch(self, size: int) -> List[Tuple[str, Optional[str]]]:
+        """Take up to ``size`` queued URLs"""
+        return [self._queue.popleft() for _ in range(min(size, len(self._queue)))]
+
+    def __len__(self) -> int:
+        return len(self._queue)
@@ -0,0 +1,113 @@
+"""
+On-disk HTTP cache for conditional re-fetching of pages
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+import requests
+
+
+class CacheEntry(NamedTuple):
+    """A cached response body with its validators"""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    def validators(self) -> Dict[str, str]:
+        """Headers that turn the next GET into a conditional request"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """A size-bounded LRU response cache stored in a SQLite file
+
+    Only responses carrying an ``ETag`` or ``Last-Modified`` header are kept,
+    since those are the ones a server can answer with ``304 Not Modified``.
+    """
+
+    def __init__(self, path: str = "http_cache.sqlite",
+                 max_bytes: int = 100 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for ``url`` and mark it as recently used"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE url = ?",
+                (time.time(), url)
+            )
+            self._conn.commit()
+        return CacheEntry(*row)
+
+    def put(self, url: str, response: requests.Response):
+        """Store a response if it has validators, then enforce the size bound"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, len(body), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits ``max_bytes``"""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale = []
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access"
+        ):
+            if total <= self.max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", stale)
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,142 @@
+"""
+Crawl metrics: per-stage timing histograms and counters
+
+Exportable as JSON or in the Prometheus text exposition format.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Crawl stages, in the order a page passes through them
+STAGES = ('throttle', 'fetch', 'parse', 'extract', 'write')
+
+COUNTERS = {
+    'pages': 'Pages downloaded or revalidated',
+    'records': 'Records emitted by the crawl',
+    'bytes_downloaded': 'Response body bytes received',
+    'retries': 'Requests retried after a throttling or transient error',
+    'not_modified': 'Responses served from the cache after a 304',
+    'errors': 'Pages that failed to download or parse',
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed durations"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Counts of observations <= each bucket bound, ending with +Inf"""
+        totals, running = [], 0
+        for count in self.counts:
+            running += count
+            totals.append(running)
+        return totals
+
+    def to_dict(self) -> Dict:
+        """Summary suitable for JSON export"""
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.cumulative())),
+        }
+
+
+class ScraperMetrics:
+    """Thread-safe timing histograms per stage plus crawl counters"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.started = time.monotonic()
+        self.histograms = {stage: Histogram(buckets) for stage in STAGES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Add a duration to a stage histogram"""
+        with self._lock:
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time the enclosed block into ``stage``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def increment(self, counter: str, amount: int = 1):
+        """Increase a counter"""
+        with self._lock:
+            self.counters[counter] += amount
+
+    def elapsed(self) -> float:
+        """Seconds since the metrics were created"""
+        return time.monotonic() - self.started
+
+    def pages_per_second(self) -> float:
+        """Average page throughput over the run so far"""
+        elapsed = self.elapsed()
+        return self.counters['pages'] / elapsed if elapsed else 0.0
+
+    def to_dict(self) -> Dict:
+        """Snapshot of every metric"""
+        with self._lock:
+            return {
+                'elapsed_seconds': round(self.elapsed(), 3),
+                'pages_per_second': round(self.pages_per_second(), 3),
+                'counters': dict(self.counters),
+                'stages': {stage: h.to_dict() for stage, h in self.histograms.items()},
+            }
+
+    def to_json(self) -> str:
+        """Snapshot as a JSON document"""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix: str = 'scraper') -> str:
+        """Snapshot in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_stage_seconds Time spent in each crawl stage",
+                f"# TYPE {prefix}_stage_seconds histogram",
+            ]
+            for stage, histogram in self.histograms.items():
+                bounds = [repr(b) for b in histogram.buckets] + ['+Inf']
+                for bound, total in zip(bounds, histogram.cumulative()):
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {total}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            for counter, help_text in COUNTERS.items():
+                name = f"{prefix}_{counter}_total"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter",
+                          f"{name} {self.counters[counter]}"]
+
+            name = f"{prefix}_pages_per_second"
+            lines += [f"# HELP {name} Average page throughput since the crawl started",
+                      f"# TYPE {name} gauge", f"{name} {self.pages_per_second()}"]
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path: str):
+        """Write the snapshot as Prometheus text (``.prom``) or JSON"""
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
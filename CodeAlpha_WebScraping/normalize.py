@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Vectorized normalization of scraped book records into typed columns
+
+Usage:
+    python normalize.py books_data.csv books_typed.parquet
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# Index + 1 is the star count; anything else maps to 0 (unknown)
+RATING_WORDS = ['One', 'Two', 'Three', 'Four', 'Five']
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['availability', 'category']
+
+
+def normalize_books(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert raw scraped columns into typed ones in bulk
+
+    - ``price`` ("£51.77") becomes float64
+    - ``rating`` ("Three") becomes int8 stars, 0 when unknown
+    - ``in_stock`` is a boolean derived from ``availability``
+    - ``stock_count`` (when present) becomes nullable Int32
+    - ``availability`` and ``category`` become categoricals
+    """
+    df = df.copy()
+
+    if 'price' in df:
+        df['price'] = pd.to_numeric(
+            df['price'].astype('string').str.replace(r'[^0-9.]', '', regex=True),
+            errors='coerce'
+        ).astype('float64')
+
+    if 'rating' in df:
+        codes = pd.Categorical(df['rating'], categories=RATING_WORDS).codes
+        df['rating'] = (codes + 1).astype(np.int8)
+
+    if 'availability' in df:
+        availability = df['availability'].astype('string').str.strip()
+        df['in_stock'] = availability.str.startswith('In stock').fillna(False).astype(bool)
+        df['availability'] = availability
+
+    if 'stock_count' in df:
+        df['stock_count'] = pd.to_numeric(df['stock_count'], errors='coerce').astype('Int32')
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype('category')
+
+    return df
+
+
+def read_records(path: str) -> pd.DataFrame:
+    """Load scraper output written as CSV, JSON Lines or Parquet"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    if extension in ('.jsonl', '.ndjson'):
+        return pd.read_json(path, lines=True, dtype=False)
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported input format '{extension}'")
+
+
+def main():
+    """Normalize a scraper output file and write the typed result"""
+    if len(sys.argv) != 3:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    source, target = sys.argv[1:]
+    df = normalize_books(read_records(source))
+
+    if target.lower().endswith('.parquet'):
+        df.to_parquet(target, index=False)
+    else:
+        df.to_csv(target, index=False, encoding='utf-8')
+
+    print(f"✅ Normalized {len(df)} records into {target}")
+    print(df.dtypes.to_string())
+
+
+if __name__ == "__main__":
+    main()
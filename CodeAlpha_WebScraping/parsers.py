@@ -0,0 +1,304 @@
+"""
+Pluggable HTML parsing backends for listing and product detail pages
+
+Every backend takes the raw page bytes and returns the same book dicts.
+``html.parser`` (BeautifulSoup's pure-Python parser) is always available;
+``lxml`` and ``selectolax`` are used only when installed.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Errors raised by a backend when a product_pod is missing an expected node
+PARSE_ERRORS = (AttributeError, KeyError, IndexError, TypeError)
+
+STOCK_PATTERN = re.compile(r'\((\d+) available\)')
+
+# Every field a book record can have, with its output type; listing pages
+# give the first five (plus ``category`` in category crawls), product pages
+# the rest
+BOOK_COLUMNS = {
+    'title': 'string',
+    'price': 'string',
+    'availability': 'string',
+    'rating': 'string',
+    'url': 'string',
+    'category': 'string',
+    'upc': 'string',
+    'description': 'string',
+    'stock_count': 'int64',
+}
+
+# The pager of a listing chain, e.g. 'Page 1 of 50'
+PAGE_COUNT_PATTERN = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+
+
+def parse_stock_count(availability: str) -> Optional[int]:
+    """Pull the number of copies out of text like 'In stock (22 available)'"""
+    match = STOCK_PATTERN.search(availability)
+    return int(match.group(1)) if match else None
+
+
+def parse_page_count(pager: Optional[str]) -> Optional[int]:
+    """Pull the number of pages out of pager text like 'Page 1 of 50'"""
+    match = PAGE_COUNT_PATTERN.search(pager or '')
+    return int(match.group(1)) if match else None
+
+
+def _links_record(next_url: Optional[str], categories: List[Tuple[str, str]],
+                  pager: Optional[str] = None) -> Dict:
+    """Assemble the navigation links found on a listing page"""
+    return {'next': next_url, 'categories': categories, 'page_count': parse_page_count(pager)}
+
+
+def _detail_record(upc, description, availability, category) -> Dict:
+    """Assemble the detail fields shared by every backend"""
+    return {
+        'upc': upc,
+        'description': description,
+        'stock_count': parse_stock_count(availability),
+        'category': category
+    }
+
+
+def extract_books_from_soup(soup: BeautifulSoup) -> List[Dict]:
+    """Extract book data from an already parsed BeautifulSoup tree"""
+    books = []
+
+    for article in soup.find_all('article', class_='product_pod'):
+        try:
+            title = article.h3.a['title']
+            url = article.h3.a['href']
+            price = article.find('p', class_='price_color').text
+            availability = article.find('p', class_='instock availability').text.strip()
+            rating = article.p['class'][1]  # Extract rating from class names
+
+            books.append({
+                'title': title,
+                'price': price,
+                'availability': availability,
+                'rating': rating,
+                'url': url
+            })
+        except PARSE_ERRORS as e:
+            logger.warning(f"Error parsing book: {e}")
+            continue
+
+    return books
+
+
+def extract_links_from_soup(soup: BeautifulSoup) -> Dict:
+    """Extract the next-page link, category links and page count from a listing page"""
+    next_link = soup.select_one('li.next > a')
+    pager = soup.select_one('li.current')
+    categories = [
+        (link['href'], link.text.strip())
+        for link in soup.select('.side_categories ul ul a')
+    ]
+    return _links_record(next_link['href'] if next_link else None, categories,
+                         pager.text if pager else None)
+
+
+def extract_detail_from_soup(soup: BeautifulSoup) -> Dict:
+    """Extract UPC, description, stock count and category from a product page"""
+    table = {row.th.text: row.td.text for row in soup.find('table', class_='table').find_all('tr')}
+    description = soup.find('div', id='product_description')
+    breadcrumb = soup.find('ul', class_='breadcrumb').find_all('li')
+
+    return _detail_record(
+        upc=table['UPC'],
+        description=description.find_next_sibling('p').text if description else '',
+        availability=table.get('Availability', ''),
+        category=breadcrumb[2].text.strip()
+    )
+
+
+def _soup_tree(content: bytes) -> BeautifulSoup:
+    """Build a tree with BeautifulSoup's built-in html.parser"""
+    return BeautifulSoup(content, 'html.parser')
+
+
+def _books_from_lxml(tree) -> List[Dict]:
+    """Extract book data from an lxml document"""
+    books = []
+
+    for article in tree.xpath('//article[contains(concat(" ", @class, " "), " product_pod ")]'):
+        try:
+            title = article.xpath('.//h3/a/@title')[0]
+            url = article.xpath('.//h3/a/@href')[0]
+            price = article.xpath('.//p[@class="price_color"]')[0].text_content()
+            availability = article.xpath(
+                './/p[@class="instock availability"]'
+            )[0].text_content().strip()
+            rating = article.xpath('.//p')[0].get('class').split()[1]
+
+            books.append({
+                'title': title,
+                'price': price,
+                'availability': availability,
+                'rating': rating,
+                'url': url
+            })
+        except PARSE_ERRORS as e:
+            logger.warning(f"Error parsing book: {e}")
+            continue
+
+    return books
+
+
+def _links_from_lxml(tree) -> Dict:
+    """Extract the next-page link, category links and page count from an lxml document"""
+    next_href = tree.xpath('//li[@class="next"]/a/@href')
+    pager = tree.xpath('string(//li[@class="current"])')
+    categories = [
+        (link.get('href'), link.text_content().strip())
+        for link in tree.xpath('//div[@class="side_categories"]//ul//ul//a')
+    ]
+    return _links_record(next_href[0] if next_href else None, categories, pager)
+
+
+def _detail_from_lxml(tree) -> Dict:
+    """Extract product page fields from an lxml document"""
+    table = {
+        row.xpath('string(th)'): row.xpath('string(td)')
+        for row in tree.xpath('//table[contains(@class, "table")]//tr')
+    }
+    description = tree.xpath('//div[@id="product_description"]/following-sibling::p[1]')
+
+    return _detail_record(
+        upc=table['UPC'],
+        description=description[0].text_content() if description else '',
+        availability=table.get('Availability', ''),
+        category=tree.xpath('//ul[@class="breadcrumb"]/li')[2].text_content().strip()
+    )
+
+
+def _lxml_tree(content: bytes):
+    """Build a tree with lxml's C parser"""
+    from lxml import html
+
+    return html.fromstring(content)
+
+
+def _books_from_selectolax(tree) -> List[Dict]:
+    """Extract book data from a selectolax document"""
+    books = []
+
+    for article in tree.css('article.product_pod'):
+        try:
+            link = article.css_first('h3 a')
+            title = link.attributes['title']
+            url = link.attributes['href']
+            price = article.css_first('p.price_color').text()
+            availability = article.css_first('p.instock.availability').text().strip()
+            rating = article.css_first('p').attributes['class'].split()[1]
+
+            books.append({
+                'title': title,
+                'price': price,
+                'availability': availability,
+                'rating': rating,
+                'url': url
+            })
+        except PARSE_ERRORS as e:
+            logger.warning(f"Error parsing book: {e}")
+            continue
+
+    return books
+
+
+def _links_from_selectolax(tree) -> Dict:
+    """Extract the next-page link, category links and page count from a selectolax document"""
+    next_link = tree.css_first('li.next > a')
+    pager = tree.css_first('li.current')
+    categories = [
+        (link.attributes['href'], link.text().strip())
+        for link in tree.css('.side_categories ul ul a')
+    ]
+    return _links_record(next_link.attributes['href'] if next_link else None, categories,
+                         pager.text() if pager else None)
+
+
+def _detail_from_selectolax(tree) -> Dict:
+    """Extract product page fields from a selectolax document"""
+    table = {
+        row.css_first('th').text(): row.css_first('td').text()
+        for row in tree.css('table.table tr')
+    }
+    description = tree.css_first('#product_description + p')
+
+    return _detail_record(
+        upc=table['UPC'],
+        description=description.text() if description else '',
+        availability=table.get('Availability', ''),
+        category=tree.css('ul.breadcrumb li')[2].text().strip()
+    )
+
+
+def _selectolax_tree(content: bytes):
+    """Build a tree with selectolax's Lexbor engine"""
+    from selectolax.lexbor import LexborHTMLParser
+
+    return LexborHTMLParser(content)
+
+
+class ParserBackend(NamedTuple):
+    """One parsing engine, split into tree building and field extraction"""
+    name: str
+    build_tree: Callable[[bytes], Any]
+    extract_books: Callable[[Any], List[Dict]]
+    extract_links: Callable[[Any], Dict]
+    extract_detail: Callable[[Any], Dict]
+
+
+BACKENDS: Dict[str, ParserBackend] = {
+    'html.parser': ParserBackend('html.parser', _soup_tree, extract_books_from_soup,
+                                 extract_links_from_soup, extract_detail_from_soup),
+    'lxml': ParserBackend('lxml', _lxml_tree, _books_from_lxml,
+                          _links_from_lxml, _detail_from_lxml),
+    'selectolax': ParserBackend('selectolax', _selectolax_tree, _books_from_selectolax,
+                                _links_from_selectolax, _detail_from_selectolax),
+}
+
+# Module each optional backend needs at import time
+_BACKEND_MODULES = {
+    'lxml': 'lxml.html',
+    'selectolax': 'selectolax.lexbor',
+}
+
+
+def available_parsers() -> List[str]:
+    """Names of the backends whose dependencies are installed"""
+    names = []
+    for name in BACKENDS:
+        module = _BACKEND_MODULES.get(name)
+        if module is None:
+            names.append(name)
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def resolve_backend(name: str = 'html.parser') -> str:
+    """Return ``name`` if installed, otherwise fall back to html.parser"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}', choose from {list(BACKENDS)}")
+
+    if name not in available_parsers():
+        logger.warning(f"Parser backend '{name}' is not installed, using html.parser")
+        return 'html.parser'
+    return name
+
+
+def get_backend(name: str = 'html.parser') -> ParserBackend:
+    """Return the tree builder and extractors for the named backend"""
+    return BACKENDS[resolve_backend(name)]
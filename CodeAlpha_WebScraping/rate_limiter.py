@@ -0,0 +1,127 @@
+"""
+Per-host rate limiting and retry backoff for the scraper
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update"""
+        if now > self._updated:
+            earned = (now - self._updated) * self.rate
+            self._tokens = min(self.capacity, self._tokens + earned)
+            self._updated = now
+
+    def acquire(self):
+        """Take one token, sleeping until it is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            # Tokens may go negative: each caller reserves its own slot
+            wait = max(0.0, self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, delay: float):
+        """Stop handing out tokens for ``delay`` seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + delay)
+
+    def set_rate(self, rate: float):
+        """Change the refill rate without losing accumulated tokens"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class AdaptiveRateLimiter:
+    """Token buckets per host whose rate follows server feedback
+
+    Successful responses raise a host's rate additively up to ``max_rate``;
+    throttling responses halve it (down to ``min_rate``) and pause the host,
+    so the crawl settles at the fastest rate the server tolerates.
+    """
+
+    def __init__(self, rate: Optional[float] = 1.0,
+                 max_rate: Optional[float] = None,
+                 min_rate: float = 0.1,
+                 burst: float = 1.0):
+        # ``None`` means unlimited: only server-requested pauses apply
+        self.rate = rate if rate else float('inf')
+        self.max_rate = max_rate or self.rate
+        self.min_rate = min(min_rate, self.rate)
+        self.burst = burst
+        self.step = self.rate * 0.1 if rate else 0.0
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Return the token bucket for the host of ``url``"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url: str):
+        """Block until a request to ``url`` fits the host's budget"""
+        self.bucket(url).acquire()
+
+    def on_success(self, url: str):
+        """Additively increase the host's rate after a good response"""
+        bucket = self.bucket(url)
+        if bucket.rate < self.max_rate:
+            bucket.set_rate(min(self.max_rate, bucket.rate + self.step))
+
+    def on_throttle(self, url: str, delay: float):
+        """Halve the host's rate and pause it for ``delay`` seconds"""
+        bucket = self.bucket(url)
+        bucket.set_rate(max(self.min_rate, bucket.rate / 2))
+        bucket.pause(delay)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter for the given retry attempt"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -2,14 +2,30 @@
 Main web scraping script
 """
 
+import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import time
 import logging
-from typing import List, Dict
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Iterator, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 import sys
 
+from checkpoint import CrawlCheckpoint, content_hash
+from http_cache import HTTPCache
+from frontier import CrawlFrontier
+from metrics import ScraperMetrics
+from parsers import BOOK_COLUMNS, get_backend
+from sinks import RecordSink, open_sink
+from rate_limiter import (
+    AdaptiveRateLimiter, RETRY_STATUSES, backoff_delay, parse_retry_after
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,72 +33,400 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Sentinel marking the end of a pipeline queue
+_DONE = object()
+
+# The page number in a numbered listing URL, e.g. catalogue/page-2.html
+PAGE_NUMBER_PATTERN = re.compile(r'page-(\d+)\.html$')
+
+
+class Listing(NamedTuple):
+    """A fetched listing page: its books and where to go next"""
+    url: str
+    digest: Optional[str]
+    books: List[Dict]
+    links: Dict
+
+
 class WebScraper:
     """A simple web scraper for educational purposes"""
     
-    def __init__(self, base_url: str = "http://books.toscrape.com/"):
+    def __init__(self, base_url: str = "http://books.toscrape.com/",
+                 max_workers: int = 1,
+                 requests_per_second: Optional[float] = 1.0,
+                 max_requests_per_second: Optional[float] = None,
+                 max_retries: int = 3,
+                 cache: Optional[HTTPCache] = None,
+                 parser: str = 'html.parser',
+                 checkpoint: Optional[CrawlCheckpoint] = None,
+                 follow_categories: bool = False):
         self.base_url = base_url
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.follow_categories = follow_categories
+        self.parser = get_backend(parser)
+        self.metrics = ScraperMetrics()
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=requests_per_second, max_rate=max_requests_per_second
+        )
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        
+        # Size the connection pool so concurrent workers can share the
+        # session; the detail pipeline runs listing and product workers
+        adapter = HTTPAdapter(pool_maxsize=self.max_workers * 2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def request(self, url: str, headers: Optional[Dict] = None) -> requests.Response:
+        """GET a URL within the host's rate budget, retrying transient failures
+        
+        429 and 5xx responses (and connection errors) are retried with
+        exponential backoff and jitter, honouring ``Retry-After`` when the
+        server sends one. Each throttling response also slows the host down.
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.metrics.time('throttle'):
+                self.rate_limiter.acquire(url)
+            try:
+                with self.metrics.time('fetch'):
+                    response = self.session.get(url, headers=headers, timeout=10)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Retrying {url} in {delay:.1f}s: {e}")
+                self.metrics.increment('retries')
+                with self.metrics.time('throttle'):
+                    time.sleep(delay)
+                continue
+            
+            self.metrics.increment('bytes_downloaded', len(response.content))
+            
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = parse_retry_after(response.headers.get('Retry-After'))
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                logger.warning(
+                    f"Retrying {url} in {delay:.1f}s: HTTP {response.status_code}"
+                )
+                self.rate_limiter.on_throttle(url, delay)
+                self.metrics.increment('retries')
+                continue
+            
+            response.raise_for_status()
+            self.rate_limiter.on_success(url)
+            return response
+    
+    def fetch_content(self, url: str) -> bytes:
+        """Download a page body, revalidating it against the cache if enabled"""
+        entry = self.cache.get(url) if self.cache else None
+        response = self.request(url, headers=entry.validators() if entry else None)
+        
+        self.metrics.increment('pages')
+        if response.status_code == 304 and entry:
+            logger.info(f"Not modified, using cached copy: {url}")
+            self.metrics.increment('not_modified')
+            return entry.body
+        
+        if self.cache:
+            self.cache.put(url, response)
+        return response.content
     
-    def fetch_page(self, url: str) -> BeautifulSoup:
-        """Fetch and parse a webpage"""
+    def fetch_page(self, url: str) -> Any:
+        """Fetch a webpage and parse it with the configured parser backend"""
         try:
             logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            content = self.fetch_content(url)
+            return self.parser.build_tree(content)
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             return None
     
-    def scrape_books(self, max_pages: int = 1) -> List[Dict]:
-        """Scrape book information from the website"""
-        all_books = []
+    def page_url(self, page_num: int) -> str:
+        """Build the catalogue URL for a listing page"""
+        if page_num == 1:
+            return self.base_url
+        return f"{self.base_url}catalogue/page-{page_num}.html"
+    
+    def _is_done(self, url: str) -> bool:
+        """Whether the checkpoint says ``url`` was completed in an earlier run"""
+        return self.checkpoint is not None and self.checkpoint.is_done(url)
+    
+    def _mark_done(self, url: str, digest: Optional[str], records: int):
+        """Stage a successfully parsed URL in the checkpoint"""
+        if self.checkpoint is not None and digest is not None:
+            self.checkpoint.mark_done(url, digest, records)
+    
+    def _fetch_listing(self, url: str) -> Listing:
+        """Fetch a listing page and parse its books and navigation links"""
+        try:
+            logger.info(f"Fetching: {url}")
+            content = self.fetch_content(url)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            self.metrics.increment('errors')
+            return Listing(url, None, [], {'next': None, 'categories': [], 'page_count': None})
         
-        for page_num in range(1, max_pages + 1):
-            if page_num == 1:
-                url = self.base_url
-            else:
-                url = f"{self.base_url}catalogue/page-{page_num}.html"
-            
-            soup = self.fetch_page(url)
-            if not soup:
-                continue
-            
-            books = self.extract_books_from_page(soup)
-            all_books.extend(books)
-            
-            logger.info(f"Page {page_num}: Found {len(books)} books")
-            time.sleep(1)  # Be polite to the server
+        with self.metrics.time('parse'):
+            tree = self.parser.build_tree(content)
+        with self.metrics.time('extract'):
+            books = self.parser.extract_books(tree)
+            links = self.parser.extract_links(tree)
+        for book in books:
+            book['url'] = urljoin(url, book['url'])
+        logger.info(f"{url}: Found {len(books)} books")
+        return Listing(url, content_hash(content), books, links)
+    
+    def _emit_listing(self, listing: Listing) -> Iterator[Dict]:
+        """Yield a page's books, then stage the page as done"""
+        yield from listing.books
+        self.metrics.increment('records', len(listing.books))
+        self._mark_done(listing.url, listing.digest, len(listing.books))
+    
+    def _iter_numbered(self, urls: Iterator[str]) -> Iterator[Listing]:
+        """Fetch known listing URLs, yielding them in order"""
+        if self.max_workers == 1:
+            for url in urls:
+                yield self._fetch_listing(url)
+            return
         
-        return all_books
+        # Consume futures in submission order so pages stay ordered
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for url in urls:
+                pending.append(executor.submit(self._fetch_listing, url))
+                if len(pending) >= self.max_workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
     
-    def extract_books_from_page(self, soup: BeautifulSoup) -> List[Dict]:
-        """Extract book data from a single page"""
-        books = []
+    def _chain_links(self, url: str, links: Dict) -> List[str]:
+        """Listing pages to queue after ``url``: every later page of the chain
+        when ``url`` is its first page and shows 'Page 1 of N', otherwise
+        just the ``next`` page
+        """
+        next_url = urljoin(url, links['next'])
+        match = PAGE_NUMBER_PATTERN.search(next_url)
+        if not links.get('page_count') or not match or match.group(1) != '2':
+            return [next_url]
+        prefix, suffix = next_url[:match.start(1)], next_url[match.end(1):]
+        return [f"{prefix}{page_num}{suffix}" for page_num in range(2, links['page_count'] + 1)]
+    
+    def _iter_frontier(self, skip_done: bool) -> Iterator[Listing]:
+        """Discover listing pages by following ``next`` (and category) links
         
-        for article in soup.find_all('article', class_='product_pod'):
-            try:
-                title = article.h3.a['title']
-                price = article.find('p', class_='price_color').text
-                availability = article.find('p', class_='instock availability').text.strip()
-                rating = article.p['class'][1]  # Extract rating from class names
+        The first page of a chain reads its page count from the pager and
+        queues every numbered page at once, so the workers fetch them in
+        parallel and the crawl stops exactly at the last page; chains
+        without a pager are followed one ``next`` link at a time. With
+        ``follow_categories`` the start page only seeds one chain per
+        category, and each book is tagged with the category it was found in.
+        Pages already in the checkpoint are still fetched (to find their
+        links) when ``skip_done`` is set, but their books are not emitted.
+        """
+        host = urlparse(self.base_url).netloc
+        frontier = CrawlFrontier()
+        frontier.add(self.base_url)
+        seeding = self.follow_categories
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while frontier:
+                batch = frontier.pop_batch(self.max_workers)
+                listings = executor.map(self._fetch_listing, [url for url, _ in batch])
                 
-                books.append({
-                    'title': title,
-                    'price': price,
-                    'availability': availability,
-                    'rating': rating
-                })
-            except (AttributeError, KeyError) as e:
-                logger.warning(f"Error parsing book: {e}")
-                continue
+                for (url, category), listing in zip(batch, listings):
+                    links = []
+                    if seeding:
+                        links = listing.links['categories']
+                        listing = listing._replace(books=[])
+                    elif listing.links['next']:
+                        links = [(link, category) for link in self._chain_links(url, listing.links)]
+                    
+                    for href, link_category in links:
+                        link = urljoin(url, href)
+                        if urlparse(link).netloc == host:
+                            frontier.add(link, link_category)
+                    
+                    for book in listing.books:
+                        if category:
+                            book['category'] = category
+                    if skip_done and self._is_done(url):
+                        listing = listing._replace(books=[], digest=None)
+                    yield listing
+                seeding = False
+    
+    def _iter_listings(self, max_pages: Optional[int], skip_done: bool) -> Iterator[Listing]:
+        """Yield listing pages: ``max_pages`` numbered pages, or all via links"""
+        if max_pages is None:
+            yield from self._iter_frontier(skip_done)
+            return
+        
+        urls = (self.page_url(page_num) for page_num in range(1, max_pages + 1))
+        if skip_done:
+            urls = (url for url in urls if not self._is_done(url))
+        yield from self._iter_numbered(urls)
+    
+    def scrape_page(self, page_num: int) -> List[Dict]:
+        """Fetch a single listing page and extract its books"""
+        return self._fetch_listing(self.page_url(page_num)).books
+    
+    def _fetch_detail(self, url: str) -> Tuple[Optional[str], Dict]:
+        """Fetch a product page, returning its content hash and detail fields"""
+        try:
+            logger.info(f"Fetching: {url}")
+            content = self.fetch_content(url)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            self.metrics.increment('errors')
+            return None, {}
+        
+        try:
+            with self.metrics.time('parse'):
+                tree = self.parser.build_tree(content)
+            with self.metrics.time('extract'):
+                return content_hash(content), self.parser.extract_detail(tree)
+        except (AttributeError, KeyError, IndexError, TypeError) as e:
+            logger.warning(f"Error parsing details for {url}: {e}")
+            self.metrics.increment('errors')
+            return None, {}
+    
+    def scrape_detail(self, url: str) -> Dict:
+        """Fetch a product page and extract UPC, description, stock and category"""
+        return self._fetch_detail(url)[1]
+    
+    def iter_books_with_details(self, max_pages: Optional[int] = 1,
+                                queue_size: int = 100) -> Iterator[Dict]:
+        """Yield listing records merged with their product page details
         
+        A producer thread walks the listing pages and puts each book on a
+        bounded queue; ``max_workers`` consumers fetch the detail pages and
+        hand the merged records back as they finish. Both queues are bounded,
+        so memory stays flat however large the catalogue is. Records come
+        back in completion order, not page order. With a checkpoint, books
+        whose product page was already completed are skipped.
+        """
+        todo = queue.Queue(maxsize=queue_size)
+        done = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        
+        # Both helpers give up once the caller has stopped iterating
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+        
+        def produce():
+            try:
+                for listing in self._iter_listings(max_pages, skip_done=False):
+                    if stop.is_set():
+                        break
+                    for book in listing.books:
+                        put(todo, book)
+            finally:
+                for _ in range(self.max_workers):
+                    put(todo, _DONE)
+        
+        def consume():
+            try:
+                while True:
+                    book = get(todo)
+                    if book is _DONE:
+                        break
+                    if self._is_done(book['url']):
+                        continue
+                    digest, details = self._fetch_detail(book['url'])
+                    book.update(details)
+                    put(done, (book, digest))
+            finally:
+                put(done, _DONE)
+        
+        threads = [threading.Thread(target=produce, daemon=True)]
+        threads += [threading.Thread(target=consume, daemon=True)
+                    for _ in range(self.max_workers)]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            finished = 0
+            while finished < self.max_workers:
+                item = done.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                book, digest = item
+                yield book
+                self.metrics.increment('records')
+                self._mark_done(book['url'], digest, 1)
+        finally:
+            stop.set()
+    
+    def iter_books(self, max_pages: Optional[int] = 1) -> Iterator[Dict]:
+        """Yield listing records in page order as pages complete
+        
+        Pages are fetched by up to ``max_workers`` threads sharing one
+        session; the per-host ``requests_per_second`` budget keeps the crawl
+        polite. Only a small window of pages is in flight at a time. With
+        ``max_pages=None`` pages are discovered by following links until
+        the catalogue ends. With a checkpoint, pages completed in an earlier
+        run are skipped.
+        """
+        for listing in self._iter_listings(max_pages, skip_done=True):
+            yield from self._emit_listing(listing)
+    
+    def scrape_books(self, max_pages: Optional[int] = 1, details: bool = False) -> List[Dict]:
+        """Scrape book information from the website
+        
+        Results are returned in page order unless ``details`` is set, in
+        which case product pages are crawled too (see
+        ``iter_books_with_details``).
+        """
+        if details:
+            books = list(self.iter_books_with_details(max_pages))
+        else:
+            books = list(self.iter_books(max_pages))
+        
+        if self.checkpoint:
+            self.checkpoint.commit()
         return books
     
+    def scrape_to(self, sink: RecordSink, max_pages: Optional[int] = 1,
+                  details: bool = False) -> int:
+        """Stream scraped records into ``sink`` and return how many were written
+        
+        Checkpoint progress is committed each time the sink flushes, so a
+        resumed crawl picks up exactly after the last records on disk.
+        """
+        if self.checkpoint:
+            sink.flush_callbacks.append(self.checkpoint.commit)
+        
+        records = self.iter_books_with_details(max_pages) if details else self.iter_books(max_pages)
+        for record in records:
+            with self.metrics.time('write'):
+                sink.write(record)
+        with self.metrics.time('write'):
+            sink.flush()
+        return sink.count
+    
+    def extract_books_from_page(self, tree: Any) -> List[Dict]:
+        """Extract book data from a page parsed by fetch_page"""
+        return self.parser.extract_books(tree)
+    
     def save_to_csv(self, data: List[Dict], filename: str = "scraped_data.csv"):
         """Save scraped data to CSV file"""
         df = pd.DataFrame(data)
@@ -94,21 +438,33 @@ def main():
     """Main function to run the scraper"""
     logger.info("Starting web scraper...")
     
-    # Initialize scraper
-    scraper = WebScraper()
+    # Pass --resume to continue an interrupted crawl instead of starting over
+    resume = '--resume' in sys.argv[1:]
+    
+    # Initialize scraper (4 workers sharing a 2 requests/second budget)
+    scraper = WebScraper(max_workers=4, requests_per_second=2.0,
+                         cache=HTTPCache("http_cache.sqlite"), parser='lxml',
+                         checkpoint=CrawlCheckpoint("crawl_checkpoint.sqlite", resume=resume))
     
-    # Scrape data (limit to 2 pages for demo)
+    # Scrape the whole catalogue (the first page's pager gives the page
+    # count, so the workers fetch numbered pages in parallel), writing
+    # rows as they arrive
     logger.info("Scraping book data...")
-    books_data = scraper.scrape_books(max_pages=2)
+    with open_sink("books_data.csv", flush_every=100, append=resume,
+                   columns=BOOK_COLUMNS) as sink:
+        total = scraper.scrape_to(sink, max_pages=None)
     
-    if books_data:
-        # Save and display results
-        df = scraper.save_to_csv(books_data, "books_data.csv")
-        
+    # Export crawl metrics for dashboards and regression tracking
+    scraper.metrics.save("scraper_metrics.json")
+    scraper.metrics.save("scraper_metrics.prom")
+    
+    if total:
         # Print summary
+        df = pd.read_csv("books_data.csv", nrows=5)
         logger.info(f"Scraping completed successfully!")
-        logger.info(f"Total books scraped: {len(books_data)}")
-        logger.info(f"Sample data:\n{df.head().to_string()}")
+        logger.info(f"Total books scraped: {total}")
+        logger.info(f"Throughput: {scraper.metrics.pages_per_second():.2f} pages/second")
+        logger.info(f"Sample data:\n{df.to_string()}")
     else:
         logger.error("No data was scraped")
         sys.exit(1)
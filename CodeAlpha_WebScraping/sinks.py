@@ -0,0 +1,174 @@
+"""
+Streaming output writers that append scraped records as they arrive
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RecordSink(ABC):
+    """Buffer records and write them out in chunks
+
+    A chunk is written once ``flush_every`` records are buffered or
+    ``flush_interval`` seconds have passed since the last write, so at most
+    one chunk is held in memory and a crash loses at most one chunk.
+    Callables in ``flush_callbacks`` run after every flush, once the
+    records written so far are on disk. ``columns`` optionally fixes the
+    output columns up front as ``{name: type}`` (Parquet type aliases such
+    as ``'string'`` or ``'int64'``); otherwise they come from the first chunk.
+    """
+
+    def __init__(self, path: str, flush_every: int = 1000,
+                 flush_interval: float = 5.0, append: bool = False,
+                 columns: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.columns = columns
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.append = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.count = 0
+        self.flush_callbacks: List[Callable[[], None]] = []
+        self._buffer: List[Dict] = []
+        self._last_flush = time.monotonic()
+
+    def write(self, record: Dict):
+        """Buffer a record, flushing when the chunk is full or stale"""
+        self._buffer.append(record)
+        self.count += 1
+        if (len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered chunk to disk"""
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+        for callback in self.flush_callbacks:
+            callback()
+
+    @abstractmethod
+    def _write_chunk(self, records: List[Dict]):
+        """Write one chunk of records to the output"""
+
+    def close(self):
+        """Flush remaining records and release the file"""
+        self.flush()
+        logger.info(f"Wrote {self.count} records to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CSVSink(RecordSink):
+    """Append records to a CSV file, writing the header once"""
+
+    def __init__(self, path: str, fieldnames: Optional[List[str]] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.fieldnames = fieldnames
+        self._file = open(path, 'a' if self.append else 'w', newline='', encoding='utf-8')
+        self._writer = None
+
+        if self.append and self.fieldnames is None:
+            # Reuse the existing header so appended rows line up
+            with open(path, newline='', encoding='utf-8') as f:
+                self.fieldnames = next(csv.reader(f))
+        elif self.fieldnames is None and self.columns:
+            self.fieldnames = list(self.columns)
+
+    def _write_chunk(self, records: List[Dict]):
+        if self._writer is None:
+            self.fieldnames = self.fieldnames or list(records[0])
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames,
+                                          restval='', extrasaction='ignore')
+            if not self.append:
+                self._writer.writeheader()
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class JSONLinesSink(RecordSink):
+    """Append records to a newline-delimited JSON file"""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        self._file = open(path, 'a' if self.append else 'w', encoding='utf-8')
+
+    def _write_chunk(self, records: List[Dict]):
+        self._file.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetSink(RecordSink):
+    """Write each chunk as a Parquet row group (requires pyarrow)
+
+    The schema comes from ``columns`` or, without it, from the first chunk;
+    records missing a column get nulls. Pass ``columns`` when a field can be
+    missing or None in a whole chunk, since an inferred null column cannot
+    hold later values. Parquet files cannot be appended to, so ``append`` is
+    ignored.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow")
+
+        kwargs['append'] = False
+        super().__init__(path, **kwargs)
+        self._pa = pa
+        self._pq = pq
+        self._writer = None
+
+    def _write_chunk(self, records: List[Dict]):
+        if self._writer is None:
+            if self.columns:
+                schema = self._pa.schema([(name, self._pa.type_for_alias(type_name))
+                                          for name, type_name in self.columns.items()])
+            else:
+                schema = self._pa.Table.from_pylist(records).schema
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        table = self._pa.Table.from_pylist(records, schema=self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        super().close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+SINKS = {
+    '.csv': CSVSink,
+    '.jsonl': JSONLinesSink,
+    '.ndjson': JSONLinesSink,
+    '.parquet': ParquetSink,
+}
+
+
+def open_sink(path: str, **kwargs) -> RecordSink:
+    """Create the sink matching the file extension of ``path``"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format '{extension}', choose from {list(SINKS)}")
+    return SINKS[extension](path, **kwargs)
@@ -0,0 +1,84 @@
+import json
+import os
+import pytest
+from checkpoint import CrawlCheckpoint, content_hash
+from scraper import WebScraper
+from sinks import open_sink
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'catalogue_page.html')
+
+
+@pytest.fixture(scope='module')
+def page():
+    with open(FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def scraper_for(page, checkpoint, fetched, fail_on=None):
+    scraper = WebScraper(requests_per_second=None, checkpoint=checkpoint)
+
+    def fetch_content(url):
+        if url == fail_on:
+            raise RuntimeError('crashed')
+        fetched.append(url)
+        return page
+
+    scraper.fetch_content = fetch_content
+    return scraper
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_completions_persist_only_on_commit(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.mark_done('http://a/', 'abc', 20)
+    assert not checkpoint.is_done('http://a/')
+
+    checkpoint.commit()
+    assert checkpoint.is_done('http://a/')
+    assert checkpoint.get_hash('http://a/') == 'abc'
+    checkpoint.close()
+
+    reopened = CrawlCheckpoint(path)
+    assert reopened.count() == 1
+    reopened.close()
+
+    cleared = CrawlCheckpoint(path, resume=False)
+    assert cleared.count() == 0
+    assert cleared.get_hash('http://a/') is None
+    cleared.close()
+
+
+def test_content_hash_is_stable():
+    assert content_hash(b'page') == content_hash(b'page')
+    assert content_hash(b'page') != content_hash(b'page 2')
+
+
+def test_resume_skips_completed_pages(tmp_path, page):
+    checkpoint_path = str(tmp_path / 'checkpoint.sqlite')
+    output = str(tmp_path / 'books.jsonl')
+    first, second = [], []
+
+    checkpoint = CrawlCheckpoint(checkpoint_path)
+    scraper = scraper_for(page, checkpoint, first, fail_on='http://books.toscrape.com/catalogue/page-3.html')
+    with pytest.raises(RuntimeError):
+        with open_sink(output, flush_every=20) as sink:
+            scraper.scrape_to(sink, max_pages=4)
+    checkpoint.close()
+    assert len(first) == 2
+    assert len(read_jsonl(output)) == 40
+
+    checkpoint = CrawlCheckpoint(checkpoint_path, resume=True)
+    scraper = scraper_for(page, checkpoint, second)
+    with open_sink(output, flush_every=20, append=True) as sink:
+        scraper.scrape_to(sink, max_pages=4)
+    assert second == ['http://books.toscrape.com/catalogue/page-3.html',
+                      'http://books.toscrape.com/catalogue/page-4.html']
+    assert checkpoint.count() == 4
+    assert checkpoint.get_hash(first[0]) == content_hash(page)
+    checkpoint.close()
+    assert len(read_jsonl(output)) == 80
@@ -0,0 +1,54 @@
+import math
+import pytest
+from frontier import BloomFilter, CrawlFrontier
+
+
+def urls(count, prefix='http://books.example/catalogue/page'):
+    return [f'{prefix}-{i}.html' for i in range(count)]
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter(capacity=5000, error_rate=1e-4)
+    added = urls(5000)
+    assert all(bloom.add(url) for url in added)
+    assert all(url in bloom for url in added)
+    assert not any(bloom.add(url) for url in added)
+    assert len(bloom) == 5000
+
+
+def test_bloom_false_positive_rate_near_target():
+    bloom = BloomFilter(capacity=5000, error_rate=1e-3)
+    for url in urls(5000):
+        bloom.add(url)
+    others = urls(20000, prefix='http://other.example/item')
+    false_positives = sum(url in bloom for url in others)
+    assert false_positives / len(others) < 5e-3
+
+
+def test_bloom_size_follows_formula():
+    bloom = BloomFilter(capacity=1_000_000, error_rate=1e-6)
+    assert bloom.size == math.ceil(1_000_000 * math.log(1e6) / math.log(2) ** 2)
+    assert len(bloom.bits) == pytest.approx(3.6e6, rel=0.01)
+    assert bloom.hash_count == 20
+
+
+def test_frontier_admits_each_url_once():
+    frontier = CrawlFrontier(capacity=100)
+    assert frontier.add('http://books.example/a.html')
+    assert frontier.add('http://books.example/b.html', category='Travel')
+    assert not frontier.add('http://books.example/a.html')
+    assert not frontier.add('http://books.example/a.html#reviews', category='Travel')
+    assert len(frontier) == 2
+
+
+def test_frontier_pops_in_discovery_order():
+    frontier = CrawlFrontier(capacity=100)
+    for i, url in enumerate(urls(5)):
+        frontier.add(url, category=str(i))
+
+    assert frontier.pop_batch(3) == [(url, str(i)) for i, url in enumerate(urls(3))]
+    assert frontier.pop_batch(10) == [(url, str(i + 3)) for i, url in enumerate(urls(5)[3:])]
+    assert frontier.pop_batch(10) == []
+
+    # popped URLs stay seen
+    assert not frontier.add(urls(1)[0])
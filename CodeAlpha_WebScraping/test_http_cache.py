@@ -0,0 +1,77 @@
+import itertools
+import pytest
+import requests
+import http_cache
+from http_cache import CacheEntry, HTTPCache
+from scraper import WebScraper
+
+
+def response(status=200, body=b'', headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = body
+    return resp
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # A strictly increasing clock keeps the LRU order deterministic
+    ticks = itertools.count(1)
+    monkeypatch.setattr(http_cache.time, 'time', lambda: float(next(ticks)))
+    cache = HTTPCache(str(tmp_path / 'cache.sqlite'), max_bytes=30)
+    yield cache
+    cache.close()
+
+
+def test_stores_only_responses_with_validators(cache):
+    cache.put('http://a/', response(body=b'plain'))
+    cache.put('http://b/', response(body=b'tagged', headers={'ETag': '"v1"'}))
+    cache.put('http://c/', response(body=b'dated', headers={'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+
+    assert cache.get('http://a/') is None
+    assert cache.get('http://b/') == CacheEntry(b'tagged', '"v1"', None)
+    assert cache.get('http://c/').validators() == {'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+
+def test_validators_send_etag():
+    entry = CacheEntry(b'', '"abc"', 'Mon, 01 Jan 2024 00:00:00 GMT')
+    assert entry.validators() == {'If-None-Match': '"abc"',
+                                  'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+
+def test_evicts_least_recently_used(cache):
+    for name in 'abc':
+        cache.put(f'http://{name}/', response(body=name.encode() * 10, headers={'ETag': name}))
+    assert all(cache.get(f'http://{name}/') for name in 'abc')
+
+    # b is now the least recently used; a fourth page pushes it out
+    cache.get('http://a/')
+    cache.get('http://c/')
+    cache.put('http://d/', response(body=b'd' * 10, headers={'ETag': 'd'}))
+
+    assert cache.get('http://b/') is None
+    assert [cache.get(f'http://{name}/').etag for name in 'acd'] == ['a', 'c', 'd']
+
+
+def test_skips_bodies_larger_than_the_cache(cache):
+    cache.put('http://big/', response(body=b'x' * 31, headers={'ETag': 'big'}))
+    assert cache.get('http://big/') is None
+
+
+def test_not_modified_serves_cached_body(cache, monkeypatch):
+    scraper = WebScraper(requests_per_second=None, cache=cache)
+    sent = []
+
+    def get(url, headers=None, **kwargs):
+        sent.append(headers)
+        if headers and headers.get('If-None-Match') == '"v1"':
+            return response(304)
+        return response(body=b'<html>v1</html>', headers={'ETag': '"v1"'})
+
+    monkeypatch.setattr(scraper.session, 'get', get)
+
+    assert scraper.fetch_content('http://books.example/') == b'<html>v1</html>'
+    assert scraper.fetch_content('http://books.example/') == b'<html>v1</html>'
+    assert sent == [None, {'If-None-Match': '"v1"'}]
+    assert scraper.metrics.counters['not_modified'] == 1
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+import requests
+import rate_limiter
+from rate_limiter import AdaptiveRateLimiter, TokenBucket, parse_retry_after
+from scraper import WebScraper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', clock.sleep)
+    return clock
+
+
+def response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = b'<html></html>'
+    resp.url = 'http://books.example/'
+    return resp
+
+
+def test_bucket_spends_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3.0)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == pytest.approx([0.5, 0.5])
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=2.0)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == pytest.approx([1.0])
+
+
+def test_pause_delays_next_token(clock):
+    bucket = TokenBucket(rate=10.0, capacity=5.0)
+    bucket.pause(7.0)
+    bucket.acquire()
+    assert clock.sleeps == pytest.approx([7.1])
+
+
+def test_limiter_adapts_per_host(clock):
+    limiter = AdaptiveRateLimiter(rate=1.0, max_rate=2.0, min_rate=0.25)
+    limiter.on_success('http://a.example/page-1')
+    assert limiter.bucket('http://a.example/').rate == pytest.approx(1.1)
+    assert limiter.bucket('http://b.example/').rate == pytest.approx(1.0)
+
+    for _ in range(20):
+        limiter.on_success('http://a.example/')
+    assert limiter.bucket('http://a.example/').rate == pytest.approx(2.0)
+
+    for _ in range(5):
+        limiter.on_throttle('http://b.example/', 0)
+    assert limiter.bucket('http://b.example/').rate == pytest.approx(0.25)
+
+
+def test_unlimited_limiter_only_honours_pauses(clock):
+    limiter = AdaptiveRateLimiter(rate=None)
+    for _ in range(100):
+        limiter.acquire('http://a.example/')
+    assert clock.sleeps == []
+
+    limiter.on_throttle('http://a.example/', 3.0)
+    limiter.acquire('http://a.example/')
+    assert clock.sleeps == pytest.approx([3.0])
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    (' 5 ', 5.0),
+    (None, None),
+    ('', None),
+    ('soon', None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(when, usegmt=True)) == pytest.approx(30, abs=2)
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_request_waits_for_retry_after(clock, monkeypatch):
+    scraper = WebScraper(requests_per_second=4.0, max_retries=2)
+    responses = [response(429, {'Retry-After': '7'}), response(200)]
+    monkeypatch.setattr(scraper.session, 'get', lambda url, **kwargs: responses.pop(0))
+
+    assert scraper.request('http://books.example/').status_code == 200
+    # the pause, then one token at the halved rate; the success speeds up again
+    assert clock.sleeps == pytest.approx([7.5])
+    assert scraper.rate_limiter.bucket('http://books.example/').rate == pytest.approx(2.4)
+
+
+def test_request_gives_up_after_max_retries(clock, monkeypatch):
+    scraper = WebScraper(requests_per_second=None, max_retries=1)
+    responses = [response(503, {'Retry-After': '1'}), response(503)]
+    monkeypatch.setattr(scraper.session, 'get', lambda url, **kwargs: responses.pop(0))
+
+    with pytest.raises(requests.HTTPError):
+        scraper.request('http://books.example/')
+    assert responses == []
@@ -0,0 +1,98 @@
+import csv
+import json
+import pytest
+from sinks import CSVSink, JSONLinesSink, ParquetSink, RecordSink, open_sink
+
+RECORDS = [
+    {'title': 'A Light in the Attic', 'price': 51.77, 'rating': 3},
+    {'title': 'Tipping the Velvet', 'price': 53.74, 'rating': 1},
+    {'title': 'Soumission', 'price': 50.1, 'rating': 1},
+]
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_record_sink_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        RecordSink(str(tmp_path / 'out'))
+
+
+@pytest.mark.parametrize('extension, sink_class', [
+    ('.csv', CSVSink), ('.jsonl', JSONLinesSink), ('.ndjson', JSONLinesSink), ('.parquet', ParquetSink),
+])
+def test_open_sink_picks_format(tmp_path, extension, sink_class):
+    with open_sink(str(tmp_path / f'out{extension}')) as sink:
+        assert type(sink) is sink_class
+
+
+def test_open_sink_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / 'out.xml'))
+
+
+def test_flushes_in_chunks(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    flushes = []
+    with JSONLinesSink(path, flush_every=2, flush_interval=3600) as sink:
+        sink.flush_callbacks.append(lambda: flushes.append(len(read_jsonl(path))))
+        for record in RECORDS:
+            sink.write(record)
+        assert flushes == [2]
+        assert len(read_jsonl(path)) == 2
+    assert flushes == [2, 3]
+    assert sink.count == 3
+
+
+def test_csv_appends_under_existing_header(tmp_path):
+    path = str(tmp_path / 'out.csv')
+    with CSVSink(path) as sink:
+        sink.write(RECORDS[0])
+    with CSVSink(path, append=True) as sink:
+        sink.write({'rating': 1, 'title': 'Tipping the Velvet', 'price': 53.74, 'extra': 'x'})
+
+    rows = read_csv(path)
+    assert list(rows[0]) == ['title', 'price', 'rating']
+    assert [row['title'] for row in rows] == ['A Light in the Attic', 'Tipping the Velvet']
+    assert rows[1]['rating'] == '1'
+
+
+def test_csv_uses_declared_columns(tmp_path):
+    path = str(tmp_path / 'out.csv')
+    with CSVSink(path, columns={'title': 'string', 'upc': 'string'}) as sink:
+        sink.write({'title': 'Soumission'})
+    assert read_csv(path) == [{'title': 'Soumission', 'upc': ''}]
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    with JSONLinesSink(path) as sink:
+        sink.write(RECORDS[0])
+    with JSONLinesSink(path, append=True) as sink:
+        for record in RECORDS[1:]:
+            sink.write(record)
+    assert read_jsonl(path) == RECORDS
+
+
+def test_parquet_row_groups_and_declared_schema(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'out.parquet')
+    columns = {'title': 'string', 'price': 'double', 'rating': 'int64', 'upc': 'string'}
+    with ParquetSink(path, flush_every=2, columns=columns) as sink:
+        for record in RECORDS:
+            sink.write(record)
+        sink.write({'title': 'Sharp Objects', 'upc': 'e00eb4fd7b871a48'})
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 2
+    rows = parquet.read().to_pylist()
+    assert [row['title'] for row in rows] == [record['title'] for record in RECORDS] + ['Sharp Objects']
+    assert rows[0]['upc'] is None
+    assert rows[3]['price'] is None and rows[3]['upc'] == 'e00eb4fd7b871a48'
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Stream a CSV or JSONL review file through the sentiment analyzer
+
+Usage:
+    python analyze_file.py reviews.csv scored.parquet --text-column review
+    python analyze_file.py reviews.jsonl scored.jsonl --mode full --processes 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import pandas as pd
+
+from sentiment_analyzer import SentimentAnalyzer
+
+# Result columns written for every row, in order
+OUTPUT_COLUMNS = ['sentiment', 'confidence', 'compound', 'neg', 'neu', 'pos',
+                  'polarity', 'subjectivity', 'emotion', 'word_count', 'char_count']
+
+FULL_FIELDS = ['sentiment', 'confidence', 'polarity', 'subjectivity', 'emotion',
+               'word_count', 'char_count', 'vader_scores']
+
+
+def read_chunks(path, chunk_size):
+    """
+    Yield DataFrames of at most chunk_size rows from a CSV or JSONL file
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    elif extension in ('.jsonl', '.ndjson'):
+        reader = pd.read_json(path, lines=True, dtype=False, chunksize=chunk_size)
+    else:
+        raise ValueError(f"Unsupported input format '{extension}'")
+    with reader:
+        yield from reader
+
+
+class ChunkWriter:
+    def __init__(self, path):
+        """
+        Append result chunks to a CSV, JSONL or Parquet file
+        """
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower().lstrip('.')
+        if self.format == 'ndjson':
+            self.format = 'jsonl'
+        if self.format not in ('csv', 'jsonl', 'parquet'):
+            raise ValueError(f"Unsupported output format '.{self.format}'")
+        self._file = None
+        self._parquet = None
+    
+    def write(self, df):
+        """
+        Write one chunk
+        """
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df.astype({c: str for c in df.select_dtypes('category')}),
+                                         preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        elif self.format == 'csv':
+            first = self._file is None
+            if first:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            df.to_csv(self._file, header=first, index=False)
+        else:
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8')
+            text = df.to_json(orient='records', lines=True, force_ascii=False)
+            self._file.write(text if text.endswith('\n') or not text else text + '\n')
+    
+    def close(self):
+        """
+        Flush and close the output
+        """
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def result_frame(results):
+    """
+    Flatten analyze_sentiment results into the OUTPUT_COLUMNS frame
+    """
+    rows = []
+    for result in results:
+        vader_scores = result.pop('vader_scores')
+        rows.append({**result, **vader_scores})
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+
+def iter_scored(analyzer, chunks, text_column, mode, processes):
+    """
+    Yield (input chunk, result frame) pairs
+    With --processes the texts of all chunks flow through one worker pool
+    """
+    if mode == 'batch':
+        for chunk in chunks:
+            yield chunk, analyzer.score_batch(chunk[text_column].tolist())[OUTPUT_COLUMNS]
+    elif processes <= 1:
+        for chunk in chunks:
+            texts = chunk[text_column].tolist()
+            yield chunk, result_frame(analyzer.analyze_sentiment(text, fields=FULL_FIELDS)
+                                      for text in texts)
+    else:
+        pending = deque()
+        
+        def texts():
+            for chunk in chunks:
+                pending.append(chunk)
+                yield from chunk[text_column].tolist()
+        
+        results = analyzer.analyze_parallel(texts(), processes)
+        for first in results:
+            chunk = pending.popleft()
+            yield chunk, result_frame([first, *islice(results, len(chunk) - 1)])
+
+
+def main():
+    """
+    Analyze a review file chunk by chunk, writing results as they are ready
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('source', help='input .csv or .jsonl file')
+    arg_parser.add_argument('target', help='output .csv, .jsonl or .parquet file')
+    arg_parser.add_argument('--text-column', default='text')
+    arg_parser.add_argument('--keep-columns', nargs='*', default=[],
+                            help='input columns copied to the output (e.g. an id)')
+    arg_parser.add_argument('--chunk-size', type=int, default=5000)
+    arg_parser.add_argument('--mode', choices=['batch', 'full'], default='batch',
+                            help='vectorized batch scoring, or the full per-text analyzer')
+    arg_parser.add_argument('--processes', type=int, default=1,
+                            help='worker processes for --mode full')
+    args = arg_parser.parse_args()
+    
+    analyzer = SentimentAnalyzer()
+    writer = ChunkWriter(args.target)
+    rows = 0
+    start = time.perf_counter()
+    
+    def chunks():
+        for chunk in read_chunks(args.source, args.chunk_size):
+            if args.text_column not in chunk:
+                arg_parser.error(f"column '{args.text_column}' not found in {args.source}")
+            chunk[args.text_column] = chunk[args.text_column].fillna('').astype(str)
+            yield chunk.reset_index(drop=True)
+    
+    try:
+        for chunk, scored in iter_scored(analyzer, chunks(), args.text_column,
+                                         args.mode, args.processes):
+            writer.write(pd.concat([chunk[args.keep_columns], scored], axis=1))
+            
+            rows += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"\r📊 {rows} rows analyzed, {rows / elapsed:.0f} rows/s",
+                  end='', file=sys.stderr, flush=True)
+    finally:
+        writer.close()
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Analyzed {rows} texts in {elapsed:.1f}s "
+          f"({rows / elapsed if elapsed else 0:.0f} texts/s) into {args.target}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,42 @@
-from flask import Flask, render_template, request, jsonify, session
-from sentiment_analyzer import SentimentAnalyzer
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
+from sentiment_analyzer import SentimentAnalyzer, RESULT_FIELDS
+from result_cache import ResultCache
+from result_store import open_result_store
+from batch_jobs import BatchJobManager
+from rolling_stats import open_rolling_aggregator
 from utils import TextUtils
 import json
+import os
 
 app = Flask(__name__)
 app.secret_key = 'sentiment-analysis-secret-key-2024'
+# Large batches are accepted, but cap request bodies at 64 MB
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024 * 1024
 
-# Initialize analyzer
-analyzer = SentimentAnalyzer()
+# Initialize analyzer with a result cache for repeated texts
+# (set SENTIMENT_CACHE_DB to share cached results between processes)
+cache = ResultCache(max_entries=10000, ttl=3600, path=os.environ.get('SENTIMENT_CACHE_DB'))
+analyzer = SentimentAnalyzer(cache=cache)
+
+# Results live server-side; the session cookie only holds their ids
+# (set RESULT_STORE_DB to share stored results between processes)
+store = open_result_store(os.environ.get('RESULT_STORE_DB'))
+
+# Running sentiment aggregates over the last minute, 5 minutes and hour
+# (with RESULT_STORE_DB they count the traffic of every worker process)
+rolling = open_rolling_aggregator(os.environ.get('RESULT_STORE_DB'), windows=(60, 300, 3600))
+
+# Background pool for batch analysis jobs; jobs get their own store with
+# no entry limit, so a busy /analyze never evicts a job's results
+job_store = open_result_store(os.environ.get('RESULT_STORE_DB'), max_entries=None)
+jobs = BatchJobManager(analyzer, job_store, aggregator=rolling)
+
+# Fields returned by the JSON API unless the client picks its own
+API_FIELDS = ['sentiment', 'confidence', 'polarity', 'subjectivity', 'emotion', 'vader_scores']
+
+# NLTK resources load on first use; SENTIMENT_WARMUP=1 loads them at import
+if os.environ.get('SENTIMENT_WARMUP', '').lower() in ('1', 'true', 'yes'):
+    analyzer.warm_up()
 
 @app.route('/')
 def index():
@@ -29,8 +58,12 @@ def analyze_sentiment():
                 'error': 'Please enter some text to analyze.'
             })
         
-        # Analyze sentiment
-        result = analyzer.analyze_sentiment(text)
+        # Analyze sentiment with the requested engine (default: VADER + TextBlob);
+        # the pages show every field, whichever engine picks the label
+        engine = request.form.get('engine') or None
+        result = analyzer.analyze_sentiment(text, engine=engine, fields=RESULT_FIELDS)
+        
+        rolling.add_result(result)
         
         # Extract source information
         sources = TextUtils.extract_source_info(text)
@@ -38,8 +71,8 @@ def analyze_sentiment():
         # Add source information to result
         result['sources'] = sources
         
-        # Store result in session for results page
-        session['last_result'] = result
+        # Store result server-side for the results page
+        session['last_result_id'] = store.save(result)
         
         return jsonify({
             'success': True,
@@ -54,7 +87,7 @@ def analyze_sentiment():
 
 @app.route('/analyze-batch', methods=['POST'])
 def analyze_batch():
-    """Analyze multiple texts at once"""
+    """Queue multiple texts for background analysis"""
     try:
         # Get texts from form
         texts_text = request.form.get('batch_text', '')
@@ -66,50 +99,19 @@ def analyze_batch():
                 'error': 'Please enter some texts to analyze.'
             })
         
-        # Limit to 50 texts to prevent overload
-        if len(texts) > 50:
-            texts = texts[:50]
-        
-        # Analyze each text
-        results = []
-        for text in texts:
-            result = analyzer.analyze_sentiment(text)
-            results.append(result)
-        
-        # Calculate overall statistics
-        sentiment_counts = {
-            'Positive': 0,
-            'Negative': 0,
-            'Neutral': 0
-        }
-        
-        for result in results:
-            sentiment_counts[result['sentiment']] += 1
+        job = jobs.submit(texts)
+        job_id = job['job_id']
         
-        total = len(results)
-        percentages = {
-            sentiment: round((count / total) * 100, 2)
-            for sentiment, count in sentiment_counts.items()
-        }
-        
-        # Determine overall sentiment
-        overall_sentiment = max(sentiment_counts.items(), key=lambda x: x[1])[0]
-        
-        batch_result = {
-            'total_texts': total,
-            'sentiment_counts': sentiment_counts,
-            'percentages': percentages,
-            'overall_sentiment': overall_sentiment,
-            'results': results
-        }
-        
-        # Store in session
-        session['batch_result'] = batch_result
+        # Only the job id goes in the session; results stay on the server
+        session['batch_job'] = job_id
         
         return jsonify({
             'success': True,
-            'batch_result': batch_result
-        })
+            'job_id': job_id,
+            'total_texts': job['total_texts'],
+            'status_url': f'/jobs/{job_id}',
+            'results_url': f'/jobs/{job_id}/results'
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -117,10 +119,104 @@ def analyze_batch():
             'error': f'An error occurred: {str(e)}'
         })
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Progress and aggregate statistics of a batch job"""
+    job = jobs.summary(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    """Page through the individual results of a batch job"""
+    job = jobs.summary(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    try:
+        results = [result.to_dict() for result in jobs.page(job_id, offset, limit) or []]
+    except LookupError as e:
+        return jsonify({'success': False, 'error': str(e)}), 410
+    next_offset = offset + len(results)
+    
+    return jsonify({
+        'success': True,
+        'status': job['status'],
+        'offset': offset,
+        'limit': limit,
+        'processed': job['processed'],
+        'results': results,
+        'next_offset': next_offset if next_offset < job['total_texts'] else None
+    })
+
+@app.route('/api/v1/score', methods=['POST'])
+def api_score():
+    """Score JSON documents, streaming one NDJSON line per document"""
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list):
+        payload = {'documents': payload}
+    if not isinstance(payload, dict) or not isinstance(payload.get('documents'), list):
+        return jsonify({
+            'success': False,
+            'error': 'Expected a JSON body with a "documents" array.'
+        }), 400
+    
+    # Bad options are rejected here: once streaming starts, errors can
+    # no longer become a 400
+    fields = payload.get('fields') or API_FIELDS
+    if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+        return jsonify({
+            'success': False,
+            'error': '"fields" must be an array of field names.',
+            'available_fields': list(RESULT_FIELDS)
+        }), 400
+    unknown = [field for field in fields if field not in RESULT_FIELDS]
+    if unknown:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown fields: {', '.join(unknown)}",
+            'available_fields': list(RESULT_FIELDS)
+        }), 400
+    
+    engine = payload.get('engine')
+    if engine is not None and not isinstance(engine, str):
+        return jsonify({'success': False, 'error': '"engine" must be an engine name.'}), 400
+    try:
+        analyzer.get_engine(engine)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def generate():
+        for index, document in enumerate(payload['documents']):
+            # Documents are {"id": ..., "text": ...} objects or bare strings
+            if isinstance(document, dict):
+                doc_id, text = document.get('id', index), document.get('text')
+            else:
+                doc_id, text = index, document
+            
+            if not isinstance(text, str):
+                line = {'id': doc_id, 'error': 'Missing "text" string'}
+            else:
+                result = analyzer.analyze_sentiment(text, engine=engine, fields=fields)
+                if 'sentiment' in result:
+                    rolling.add_result(result)
+                line = {'id': doc_id, **result}
+            yield json.dumps(line, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/stream/stats')
+def stream_stats():
+    """Rolling sentiment aggregates over recent analyses"""
+    return jsonify({'success': True, 'stats': rolling.state()})
+
 @app.route('/results')
 def show_results():
     """Display detailed results page"""
-    result = session.get('last_result', None)
+    result = store.load(session.get('last_result_id'))
     if not result:
         return render_template('index.html')
     
@@ -129,10 +225,16 @@ def show_results():
 @app.route('/batch-results')
 def show_batch_results():
     """Display batch analysis results"""
-    batch_result = session.get('batch_result', None)
+    job_id = session.get('batch_job')
+    batch_result = jobs.summary(job_id)
     if not batch_result:
         return render_template('index.html')
     
+    try:
+        batch_result['results'] = [result.to_dict()
+                                   for result in jobs.page(job_id, 0, batch_result['total_texts'])]
+    except LookupError:
+        return render_template('index.html')
     return render_template('batch_results.html', batch_result=batch_result)
 
 @app.route('/get-sample/<int:index>')
@@ -152,6 +254,8 @@ def get_sample_text(index):
 @app.route('/clear')
 def clear_session():
     """Clear session data"""
+    if session.get('last_result_id'):
+        store.delete(session['last_result_id'])
     session.clear()
     return jsonify({'success': True})
 
@@ -161,7 +265,9 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'Sentiment Analysis API',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'ready': analyzer.is_loaded,
+        'cache': analyzer.cache.stats()
     })
 
 if __name__ == '__main__':
@@ -171,6 +277,7 @@ if __name__ == '__main__':
     print("\nStarting server...")
     print("Initializing sentiment analyzer...")
     print("Downloading NLTK data (if required)...")
+    print(f"Warmed up in {analyzer.warm_up():.2f}s")
     print("\n✅ Application is ready!")
     print("\n🌐 Open your browser and visit:")
     print("   http://localhost:5000")
@@ -182,5 +289,5 @@ if __name__ == '__main__':
     print("\n🔍 Click 'Analyze Sentiment' to see results!")
     print("=" * 60)
     
-    # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Run the development server (use gunicorn -c gunicorn.conf.py in production)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
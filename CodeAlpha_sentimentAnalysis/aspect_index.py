@@ -0,0 +1,174 @@
+import re
+from collections import defaultdict
+from itertools import count
+
+import numpy as np
+
+from compact_result import Sentiment
+from phrase_matcher import PhraseMatcher
+
+# Aspect -> terms (single words or phrases) that mention it
+DEFAULT_ASPECTS = {
+    'price': ['price', 'prices', 'cost', 'costs', 'expensive', 'cheap', 'value',
+              'money', 'overpriced', 'affordable', 'worth'],
+    'delivery': ['delivery', 'delivered', 'shipping', 'shipped', 'arrived', 'courier',
+                 'package', 'packaging', 'on time', 'late'],
+    'quality': ['quality', 'build', 'material', 'materials', 'durable', 'broke',
+                'broken', 'defective', 'works', 'working', 'stopped working'],
+    'support': ['support', 'customer service', 'service', 'refund', 'responded',
+                'response', 'complaint', 'complaints', 'helpdesk'],
+}
+
+# Sentence boundaries: end punctuation followed by whitespace, or line breaks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+class AspectIndex:
+    def __init__(self, analyzer, aspects=None):
+        """
+        Inverted index from aspect terms to scored sentence spans
+
+        add_documents() splits texts into sentences, keeps the ones that
+        mention an aspect term and scores them in one vectorized batch.
+        Queries such as "all negative delivery mentions" are then answered
+        from the postings lists without scoring anything again.
+        """
+        self.analyzer = analyzer
+        self.aspects = aspects or DEFAULT_ASPECTS
+        self.matcher = PhraseMatcher(self.aspects)
+        self.names = self.matcher.labels
+        self.documents = []
+        self.doc_ids = []
+        # One entry per indexed span
+        self.span_doc = []
+        self.span_start = []
+        self.span_end = []
+        self.compound = np.zeros(0, dtype=np.float32)
+        self.sentiment = np.zeros(0, dtype=np.int8)
+        # aspect -> sentiment -> span ids, and term -> span ids
+        self.postings = {name: {s: [] for s in Sentiment} for name in self.names}
+        self.term_postings = defaultdict(list)
+    
+    @staticmethod
+    def sentences(text):
+        """
+        (start, end) character offsets of the sentences in text
+        """
+        start = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(text):
+            if boundary.start() > start:
+                yield start, boundary.start()
+            start = boundary.end()
+        if start < len(text):
+            yield start, len(text)
+    
+    def add_documents(self, texts, doc_ids=None):
+        """
+        Index and score the aspect mentions of more documents
+        texts may be any iterable; doc_ids default to the documents'
+        positions in the index
+        Returns: Number of spans added
+        """
+        if doc_ids is None:
+            doc_ids = count(len(self.documents))
+        spans, span_terms = [], []
+        for text, doc_id in zip(texts, doc_ids):
+            doc = len(self.documents)
+            self.documents.append(text)
+            self.doc_ids.append(doc_id)
+            for start, end in self.sentences(text):
+                terms = self.matcher.match(text[start:end])
+                if terms:
+                    spans.append((doc, start, end))
+                    span_terms.append(terms)
+        
+        if not spans:
+            return 0
+        
+        scores = self.analyzer.score_batch(
+            [self.documents[doc][start:end] for doc, start, end in spans]
+        )
+        compound = scores['compound'].to_numpy(dtype=np.float32)
+        sentiment = np.array([Sentiment.from_compound(c) for c in compound], dtype=np.int8)
+        
+        first = len(self.span_doc)
+        for offset, ((doc, start, end), terms) in enumerate(zip(spans, span_terms)):
+            span = first + offset
+            self.span_doc.append(doc)
+            self.span_start.append(start)
+            self.span_end.append(end)
+            label = Sentiment(int(sentiment[offset]))
+            mentioned = set()
+            for phrase in terms:
+                self.term_postings[' '.join(phrase)].append(span)
+                mentioned.update(self.matcher.phrases[phrase])
+            for index in mentioned:
+                self.postings[self.names[index]][label].append(span)
+        
+        self.compound = np.concatenate([self.compound, compound])
+        self.sentiment = np.concatenate([self.sentiment, sentiment])
+        return len(spans)
+    
+    def _span(self, span):
+        doc = self.span_doc[span]
+        return {
+            'doc_id': self.doc_ids[doc],
+            'sentence': self.documents[doc][self.span_start[span]:self.span_end[span]],
+            'start': self.span_start[span],
+            'end': self.span_end[span],
+            'sentiment': Sentiment(int(self.sentiment[span])).label,
+            'compound': round(float(self.compound[span]), 4),
+        }
+    
+    def span_ids(self, aspect=None, sentiment=None, term=None):
+        """
+        Ids of indexed spans matching an aspect and/or term, optionally
+        restricted to a sentiment label ('Positive', 'Negative', 'Neutral')
+        """
+        if sentiment is None:
+            labels = list(Sentiment)
+        elif isinstance(sentiment, str) and sentiment.upper() in Sentiment.__members__:
+            labels = [Sentiment[sentiment.upper()]]
+        else:
+            raise ValueError(f"Unknown sentiment '{sentiment}'. "
+                             f"Choose from: {', '.join(label.label for label in Sentiment)}")
+        ids = None
+        if aspect is not None:
+            if aspect not in self.postings:
+                raise ValueError(f"Unknown aspect '{aspect}'. Choose from: {', '.join(self.names)}")
+            ids = sorted(span for label in labels for span in self.postings[aspect][label])
+        if term is not None:
+            wanted = {int(label) for label in labels}
+            term_ids = [span for span in self.term_postings.get(term.lower(), [])
+                        if int(self.sentiment[span]) in wanted]
+            ids = term_ids if ids is None else sorted(set(ids) & set(term_ids))
+        if ids is None:
+            ids = [span for span in range(len(self.span_doc))
+                   if int(self.sentiment[span]) in {int(label) for label in labels}]
+        return ids
+    
+    def query(self, aspect=None, sentiment=None, term=None, limit=None):
+        """
+        Indexed mentions, e.g. query('delivery', 'Negative')
+        Returns: List of span dicts (doc_id, sentence, offsets, sentiment, compound)
+        """
+        ids = self.span_ids(aspect, sentiment, term)
+        return [self._span(span) for span in ids[:limit]]
+    
+    def summary(self):
+        """
+        Mention counts per sentiment and mean compound score for every aspect
+        """
+        summary = {}
+        for name in self.names:
+            counts = {label.label: len(spans) for label, spans in self.postings[name].items()}
+            ids = [span for spans in self.postings[name].values() for span in spans]
+            summary[name] = {
+                'mentions': len(ids),
+                'sentiment_counts': counts,
+                'mean_compound': round(float(self.compound[ids].mean()), 4) if ids else 0.0,
+            }
+        return summary
+    
+    def __len__(self):
+        return len(self.span_doc)
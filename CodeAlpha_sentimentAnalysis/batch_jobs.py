@@ -0,0 +1,188 @@
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from compact_result import CompactResult
+
+
+class BatchJob:
+    def __init__(self, texts, chunk_size):
+        """
+        State of one asynchronous batch analysis while it runs
+        """
+        self.id = uuid.uuid4().hex
+        self.texts = texts
+        self.total = len(texts)
+        self.chunk_size = chunk_size
+        self.status = 'queued'
+        self.error = None
+        self.processed = 0
+        self.sentiment_counts = {'Positive': 0, 'Negative': 0, 'Neutral': 0}
+        self.created = time.time()
+        self.updated = self.created
+        # The process running the job, to detect jobs orphaned by its exit
+        self.owner = {'host': socket.gethostname(), 'pid': os.getpid()}
+    
+    def summary(self):
+        """
+        Progress and aggregate statistics, without individual results
+        """
+        total = self.processed
+        percentages = {
+            sentiment: round((count / total) * 100, 2) if total else 0.0
+            for sentiment, count in self.sentiment_counts.items()
+        }
+        overall_sentiment = (max(self.sentiment_counts.items(), key=lambda x: x[1])[0]
+                             if total else None)
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'total_texts': self.total,
+            'processed': total,
+            'progress': round(total / self.total * 100, 2) if self.total else 100.0,
+            'chunk_size': self.chunk_size,
+            'sentiment_counts': dict(self.sentiment_counts),
+            'percentages': percentages,
+            'overall_sentiment': overall_sentiment,
+            'created': datetime.fromtimestamp(self.created).strftime("%Y-%m-%d %H:%M:%S"),
+            'updated_at': self.updated,
+            'owner': self.owner
+        }
+
+
+def _process_alive(pid):
+    """
+    Whether a process with this id exists on this host
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BatchJobManager:
+    def __init__(self, analyzer, store, max_workers=2, chunk_size=200, aggregator=None,
+                 stale_after=600):
+        """
+        Run batch analyses in a background thread pool
+
+        Jobs are processed chunk by chunk, each chunk scored in one
+        vectorized batch. After each chunk its results and the job summary
+        are saved to the store, so progress and partial results can be
+        polled while the job runs, from any process sharing the store. The
+        store should not evict entries (a job's summary would outlive its
+        chunks), only expire them. Results are also counted in the optional
+        rolling aggregator.
+
+        A job whose process has exited (a recycled or killed worker) is
+        reported as failed when polled. When that process runs on another
+        host, a job with no progress for stale_after seconds is.
+        """
+        self.analyzer = analyzer
+        self.aggregator = aggregator
+        self.store = store
+        self.chunk_size = chunk_size
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='batch-job')
+    
+    def submit(self, texts):
+        """
+        Queue texts for analysis
+        Returns: Summary of the new job
+        """
+        job = BatchJob(list(texts), self.chunk_size)
+        self.store.save(job.summary(), key=f'job:{job.id}')
+        self._executor.submit(self._run, job)
+        return job.summary()
+    
+    def summary(self, job_id):
+        """
+        Latest saved summary of a job, or None if unknown or expired
+        Jobs left unfinished by a process that went away are marked failed
+        """
+        summary = self.store.load(f'job:{job_id}') if job_id else None
+        if summary is not None and self._orphaned(summary):
+            summary['status'] = 'failed'
+            summary['error'] = 'The worker running this job exited before it finished'
+            self.store.save(summary, key=f'job:{job_id}')
+        return summary
+    
+    def _orphaned(self, summary):
+        """
+        Whether an unfinished job can no longer make progress
+        """
+        if summary['status'] not in ('queued', 'running'):
+            return False
+        owner = summary.get('owner')
+        if owner is None:
+            return False
+        if owner['host'] == socket.gethostname():
+            return not _process_alive(owner['pid'])
+        return time.time() - summary['updated_at'] > self.stale_after
+    
+    def page(self, job_id, offset=0, limit=100):
+        """
+        A slice of a job's individual results (only chunks finished so far)
+        Returns: List of CompactResult, or None if the job is unknown
+        Raises: LookupError if results in the slice are no longer stored
+        """
+        summary = self.summary(job_id)
+        if summary is None:
+            return None
+        
+        end = min(offset + limit, summary['processed'])
+        if end <= offset:
+            return []
+        
+        size = summary['chunk_size']
+        first = offset // size
+        results = []
+        for index in range(first, (end - 1) // size + 1):
+            chunk = self.store.load(f'job:{job_id}:{index}')
+            if chunk is None:
+                raise LookupError(f"Results {index * size}-{(index + 1) * size - 1} "
+                                  f"of job {job_id} have expired")
+            results.extend(chunk)
+        start = offset - first * size
+        return [CompactResult.from_row(row) for row in results[start:start + end - offset]]
+    
+    def _run(self, job):
+        """
+        Analyze a job's texts in chunks, publishing results as they finish
+        """
+        job.status = 'running'
+        try:
+            for index, start in enumerate(range(0, job.total, job.chunk_size)):
+                chunk = job.texts[start:start + job.chunk_size]
+                # Compact rows keep stored jobs small; they are rendered on request
+                results = CompactResult.from_frame(self.analyzer.score_batch(chunk))
+                for result in results:
+                    job.sentiment_counts[result.sentiment.label] += 1
+                    if self.aggregator is not None:
+                        self.aggregator.add_result(result)
+                self.store.save([result.to_row() for result in results],
+                                key=f'job:{job.id}:{index}')
+                job.processed += len(results)
+                job.updated = time.time()
+                self.store.save(job.summary(), key=f'job:{job.id}')
+            job.status = 'done'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.texts = None
+            job.updated = time.time()
+            self.store.save(job.summary(), key=f'job:{job.id}')
+    
+    def shutdown(self):
+        """
+        Stop accepting jobs and wait for running ones
+        """
+        self._executor.shutdown(wait=True)
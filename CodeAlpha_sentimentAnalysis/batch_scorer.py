@@ -0,0 +1,598 @@
+import re
+import string
+from importlib.metadata import PackageNotFoundError, version
+from itertools import chain
+import numpy as np
+import pandas as pd
+from textblob.en import sentiment as pattern_lexicon
+from phrase_matcher import TOKEN_PATTERN
+from scoring_engines import TextScores
+
+# The rules below re-implement NLTK's VADER and TextBlob's pattern analyzer
+# (using TextBlob's private tokenizer tables); they were checked against
+# these releases, and any other release is scored text by text instead
+VALIDATED_RELEASES = {'nltk': ('3.10',), 'textblob': ('0.20',)}
+
+
+def _validated():
+    for package, releases in VALIDATED_RELEASES.items():
+        try:
+            release = '.'.join(version(package).split('.')[:2])
+        except PackageNotFoundError:
+            return False
+        if release not in releases:
+            return False
+    return True
+
+
+VECTORIZED = _validated()
+if VECTORIZED:
+    try:
+        from textblob._text import (EMOTICONS, PUNCTUATION as PATTERN_PUNCTUATION, RE_EMOTICONS,
+                                    RE_SARCASM, find_tokens)
+    except ImportError:
+        VECTORIZED = False
+
+# A token made of a word and a trailing (or leading) run of punctuation
+PUNCTUATION = re.escape(string.punctuation)
+TRAILING_PUNCTUATION = rf'^([^{PUNCTUATION}]+)([{PUNCTUATION}]+)$'
+LEADING_PUNCTUATION = rf'^([{PUNCTUATION}]+)([^{PUNCTUATION}]+)$'
+
+# Emoticons and the "(!)" sarcasm mark, which TextBlob's tokenizer joins
+# again when punctuation splitting (or the writer) put spaces in them
+PATTERN_MARKS = ['(!)'] + ([emoticon for emoticons in EMOTICONS.values() for emoticon in emoticons]
+                           if VECTORIZED else [])
+
+SENTIMENT_LABELS = ['Positive', 'Negative', 'Neutral']
+
+SCORE_COLUMNS = ['sentiment', 'confidence', 'compound', 'neg', 'neu', 'pos', 'polarity',
+                 'subjectivity', 'emotion', 'word_count', 'char_count']
+PER_TEXT_FIELDS = ['sentiment', 'confidence', 'polarity', 'subjectivity', 'emotion',
+                   'word_count', 'char_count', 'vader_scores']
+
+
+class BatchSentimentScorer:
+    def __init__(self, analyzer):
+        """
+        Build lookup tables from an analyzer's VADER lexicon, TextBlob's
+        pattern lexicon and the emotion keywords
+
+        Texts are scored together: they are split on whitespace once, each
+        distinct token is tokenized and looked up once, and the rules run
+        over one token array, aggregated per text with np.bincount.
+        Duplicate texts are scored only once.
+
+        Every column matches analyze_sentiment: VADER's rules (boosters,
+        negation, "kind of", "least", idioms, "but", caps and punctuation)
+        and the TextBlob pattern analyzer's (modifiers, negation, "!",
+        emoticons) are applied in full, on the same tokens.
+
+        On NLTK or TextBlob releases other than VALIDATED_RELEASES the
+        tables are not built and texts are scored one at a time.
+        """
+        self.analyzer = analyzer
+        self.emotion_matcher = analyzer.emotion_matcher
+        self.emotion_labels = [emotion.capitalize() for emotion in self.emotion_matcher.emotions]
+        if 'Neutral' not in self.emotion_labels:
+            self.emotion_labels.append('Neutral')
+        if not VECTORIZED:
+            return
+
+        constants = analyzer.sia.constants
+        self.vader_lexicon = analyzer.sia.lexicon
+        self.boosters = constants.BOOSTER_DICT
+        self.idioms = constants.SPECIAL_CASE_IDIOMS
+        self.idiom_words = {word for phrase in chain(self.idioms, self.boosters) for word in phrase.split()}
+        self.negations = constants.NEGATE
+        self.punctuation = set(constants.PUNC_LIST)
+        self.b_decr = constants.B_DECR
+        self.c_incr = constants.C_INCR
+        self.n_scalar = constants.N_SCALAR
+
+        # pattern lexicon entries are {pos_tag: [polarity, subjectivity, intensity]}
+        self.pattern_scores = {}
+        self.pattern_modifiers = set()
+        for word, tags in pattern_lexicon.items():
+            self.pattern_scores[word] = tags[None]
+            if any(tag in tags for tag in pattern_lexicon.modifiers):
+                self.pattern_modifiers.add(word)
+        self.pattern_negations = set(pattern_lexicon.negations)
+        self.pattern_emoticons = {}
+        for (_, polarity), emoticons in EMOTICONS.items():
+            for emoticon in map(str.lower, emoticons):
+                if not emoticon.isalpha() and len(emoticon) <= 5 and emoticon not in PATTERN_PUNCTUATION:
+                    self.pattern_emoticons.setdefault(emoticon, polarity)
+        self.mark_parts = {mark[start:end] for mark in PATTERN_MARKS
+                           for start in range(len(mark)) for end in range(start + 1, len(mark) + 1)}
+
+        self.keywords = {phrase[0]: index for index, phrase in enumerate(self.emotion_matcher.phrases)}
+        self.keyword_emotions = np.zeros((len(self.keywords), len(self.emotion_labels)), dtype=np.int64)
+        for index, emotions in enumerate(self.emotion_matcher.phrases.values()):
+            self.keyword_emotions[index, list(emotions)] = 1
+
+    def score(self, texts, engine=None):
+        """
+        Score a batch of texts, labelled by a scoring engine: VADER's
+        compound for 'vader' and 'both' (the default), TextBlob's polarity
+        for 'textblob', and the engine's own compound, text by text, for
+        any other engine
+        Returns: DataFrame with one row per input text, in input order
+        """
+        texts = pd.Series(list(texts), dtype=object).fillna('').astype(str)
+        codes, uniques = pd.factorize(texts)
+        unique_texts = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+        n_docs = len(unique_texts)
+        if not VECTORIZED:
+            return self._score_each(unique_texts, engine).iloc[codes].reset_index(drop=True)
+
+        docs, words = self._split(unique_texts)
+        token_codes, vocab = self._vocabulary(words)
+        tokens = (docs, token_codes, vocab, n_docs)
+
+        scores = pd.concat([
+            self._vader_scores(*tokens),
+            self._pattern_scores(*tokens),
+            self._emotions(unique_texts, *tokens),
+        ], axis=1)
+
+        word_count = np.bincount(docs, minlength=n_docs)
+        scores['word_count'] = word_count
+        scores['char_count'] = np.where(word_count == 0, 0, unique_texts.str.len().to_numpy())
+
+        if engine is None or engine.name in ('vader', 'both'):
+            compound = scores['compound'].to_numpy()
+        elif engine.name == 'textblob':
+            compound = scores['polarity'].to_numpy()
+        else:
+            compound = np.array([engine.compound(TextScores(text, self.analyzer))
+                                 for text in unique_texts], dtype=float)
+        compound = np.where(scores['word_count'].to_numpy() == 0, 0.0, compound)
+        scores['polarity'] = self._round(scores['polarity'].to_numpy(), 3)
+        scores['subjectivity'] = self._round(scores['subjectivity'].to_numpy(), 3)
+        labels = np.where(compound >= 0.05, 'Positive',
+                          np.where(compound <= -0.05, 'Negative', 'Neutral'))
+        scores.insert(0, 'sentiment', pd.Categorical(labels, categories=SENTIMENT_LABELS))
+        scores.insert(1, 'confidence', self._round(np.abs(compound) * 100, 2))
+
+        return scores.iloc[codes].reset_index(drop=True)
+
+    def _score_each(self, texts, engine):
+        """
+        Score texts one at a time with analyze_sentiment, into the same
+        columns as the vectorized path
+        """
+        rows = []
+        for text in texts:
+            result = self.analyzer.analyze_sentiment(text, engine=engine, fields=PER_TEXT_FIELDS)
+            row = dict(result, **result['vader_scores'])
+            rows.append([row[column] for column in SCORE_COLUMNS])
+        scores = pd.DataFrame(rows, columns=SCORE_COLUMNS)
+        scores['sentiment'] = pd.Categorical(scores['sentiment'], categories=SENTIMENT_LABELS)
+        scores['emotion'] = pd.Categorical(scores['emotion'], categories=self.emotion_labels)
+        return scores.astype({'word_count': np.int64, 'char_count': np.int64})
+
+    @staticmethod
+    def _split(texts):
+        """
+        Whitespace-separated tokens of all texts as one object array, with
+        the index of the text each token comes from
+        """
+        lists = texts.str.split()
+        lengths = lists.str.len().to_numpy(dtype=np.int64)
+        tokens = np.array(list(chain.from_iterable(lists)), dtype=object)
+        return np.repeat(np.arange(len(texts)), lengths), tokens
+
+    @staticmethod
+    def _vocabulary(tokens):
+        """
+        Codes into the distinct tokens, and the distinct tokens as a Series
+        """
+        codes, vocab = pd.factorize(tokens)
+        return codes, pd.Series(np.asarray(vocab, dtype=object), dtype=object)
+
+    @staticmethod
+    def _expand(docs, codes, lists):
+        """
+        Replace every token by the list its distinct token maps to
+        Returns: (doc ids, list items) of the flattened result
+        """
+        lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+        flat = np.array(list(chain.from_iterable(lists)), dtype=object)
+        offsets = np.cumsum(lengths) - lengths
+        repeats = lengths[codes]
+        out_starts = np.cumsum(repeats) - repeats
+        take = np.arange(repeats.sum()) - np.repeat(out_starts - offsets[codes], repeats)
+        return np.repeat(docs, repeats), flat[take] if len(take) else np.empty(0, dtype=object)
+
+    @staticmethod
+    def _flatten(docs, n_docs):
+        """
+        Positions within each text and per-text token counts for tokens
+        grouped by text
+        """
+        counts = np.bincount(docs, minlength=n_docs)
+        starts = np.cumsum(counts) - counts
+        positions = np.arange(len(docs)) - starts[docs]
+        return positions, counts
+
+    @staticmethod
+    def _round(values, digits):
+        """
+        Round like Python's round(), which the per-text scores use
+        """
+        return np.array([round(value, digits) for value in values.tolist()], dtype=float)
+
+    @staticmethod
+    def _shift(values, positions, k, fill, sizes=None):
+        """
+        Value of the token k places earlier (k < 0: later) in the same text;
+        looking ahead needs sizes, the token count of each token's text
+        """
+        n = len(values)
+        shifted = np.full(n, fill, dtype=values.dtype)
+        if k > 0:
+            shifted[k:] = values[:n - k]
+            shifted[positions < k] = fill
+        else:
+            shifted[:n + k] = values[-k:]
+            if sizes is not None:
+                shifted[positions - k >= sizes] = fill
+        return shifted
+
+    @staticmethod
+    def _last_before(mask, index, starts):
+        """
+        Index of the last token before each token, in the same text, where
+        mask is set; -1 if there is none
+        """
+        if not len(index):
+            return index
+        marked = np.maximum.accumulate(np.where(mask, index, -1))
+        before = np.concatenate(([-1], marked[:-1]))
+        return np.where(before >= starts, before, -1)
+
+    def _vader_tokens(self, docs, codes, vocab):
+        """
+        Tokens as VADER's SentiText splits them: whitespace-separated words
+        of two or more characters, minus one leading or trailing run of
+        punctuation when that run is in PUNC_LIST and what remains is a word
+        of the text with all punctuation removed
+        Returns: (doc ids, token codes, distinct tokens)
+        """
+        # The text's punctuation-free words, as (text, word) keys
+        plain_codes, plain = self._vocabulary(vocab.str.replace(f'[{PUNCTUATION}]', '', regex=True)
+                                              .to_numpy(dtype=object))
+        plain_long = (plain.str.len() > 1).to_numpy()
+        token_plain = plain_codes[codes]
+        keep = plain_long[token_plain]
+        present = pd.Index(docs[keep] * len(plain) + token_plain[keep])
+
+        stripped = pd.Series(np.full(len(vocab), None, dtype=object))
+        for pattern, word_group, punctuation_group in ((LEADING_PUNCTUATION, 1, 0),
+                                                       (TRAILING_PUNCTUATION, 0, 1)):
+            parts = vocab.str.extract(pattern)
+            strippable = parts[punctuation_group].isin(self.punctuation).to_numpy()
+            stripped[strippable] = parts[word_group][strippable]
+        stripped_plain = pd.Index(plain).get_indexer(stripped)
+
+        keep = (vocab.str.len() > 1).to_numpy()[codes]
+        docs, codes = docs[keep], codes[keep]
+        candidates = np.flatnonzero(stripped_plain[codes] >= 0)
+        in_text = pd.Index(docs[candidates] * len(plain) + stripped_plain[codes[candidates]]).isin(present)
+
+        # Stripped tokens are coded after the original ones, then both are
+        # merged into one vocabulary
+        codes = codes.copy()
+        codes[candidates[in_text]] += len(vocab)
+        merged_codes, merged = self._vocabulary(np.concatenate((vocab.to_numpy(dtype=object),
+                                                                stripped.fillna('').to_numpy(dtype=object))))
+        return docs, merged_codes[codes], merged
+
+    def _vader_scores(self, docs, codes, vocab, n_docs):
+        """
+        VADER neg/neu/pos/compound for every text, computed over one token array
+        """
+        exclamations = np.bincount(docs, weights=vocab.str.count('!').to_numpy()[codes], minlength=n_docs)
+        questions = np.bincount(docs, weights=vocab.str.count(r'\?').to_numpy()[codes], minlength=n_docs)
+
+        docs, raw_codes, raw_vocab = self._vader_tokens(docs, codes, vocab)
+        positions, counts = self._flatten(docs, n_docs)
+        sizes = counts[docs]
+        vocab = raw_vocab.str.lower()
+
+        def lookup(values):
+            return np.asarray(values)[raw_codes]
+
+        def is_word(*words):
+            return lookup(vocab.isin(words))
+
+        def is_exactly(*words):
+            return lookup(raw_vocab.isin(words))
+
+        lex = lookup(vocab.map(self.vader_lexicon).to_numpy(dtype=float, na_value=np.nan))
+        booster = lookup(vocab.map(self.boosters).fillna(0.0).to_numpy(dtype=float))
+        is_booster = lookup(vocab.isin(self.boosters))
+        negated = lookup(vocab.isin(self.negations) | vocab.str.contains("n't", regex=False))
+        in_lexicon = ~np.isnan(lex)
+        is_upper = lookup(raw_vocab.str.isupper().to_numpy(dtype=bool))
+
+        upper_counts = np.bincount(docs, weights=is_upper, minlength=n_docs)
+        cap_diff = ((upper_counts > 0) & (upper_counts < counts))[docs]
+
+        def prev(values, k, fill):
+            return self._shift(values, positions, k, fill)
+
+        # Base valence; boosters and the "kind" of "kind of" carry none
+        kind_of = is_word('kind') & self._shift(is_word('of'), positions, -1, False, sizes)
+        scored = in_lexicon & ~is_booster & ~kind_of
+        valence = np.where(scored, np.nan_to_num(lex), 0.0)
+        sign = np.where(valence > 0, 1.0, -1.0)
+        valence += np.where(scored & is_upper & cap_diff, sign * self.c_incr, 0.0)
+
+        # Boosters, negations and idioms up to three tokens back, each only
+        # looked at when that token is not itself in the lexicon
+        so_this = is_exactly('so', 'this')
+        never = is_exactly('never')
+        for k, damp in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            applies = scored & ~prev(in_lexicon, k, True)
+            sign = np.where(valence < 0, -1.0, 1.0)
+            scalar = prev(booster, k, 0.0) * sign
+            prev_caps = prev(is_upper, k, False) & cap_diff
+            caps_sign = np.where(valence > 0, 1.0, -1.0)
+            scalar += np.where(prev(is_booster, k, False) & prev_caps, caps_sign * self.c_incr, 0.0)
+            valence = np.where(applies, valence + scalar * damp, valence)
+
+            # "never so good" is emphasis, not negation
+            if k == 1:
+                emphasis = np.zeros(len(docs), dtype=bool)
+            elif k == 2:
+                emphasis = prev(never, 2, False) & prev(so_this, 1, False)
+            else:
+                emphasis = (prev(never, 3, False) & prev(so_this, 2, False)) | prev(so_this, 1, False)
+            factor = np.where(emphasis, 1.5 if k == 2 else 1.25,
+                              np.where(prev(negated, k, False), self.n_scalar, 1.0))
+            valence = np.where(applies, valence * factor, valence)
+
+            if k == 3:
+                idiom_word = is_exactly(*self.idiom_words)
+                near = idiom_word.copy()
+                for offset in (1, 2, 3, -1, -2):
+                    near |= self._shift(idiom_word, positions, offset, False, sizes)
+                valence = self._vader_idioms(valence, applies & near, raw_vocab.to_numpy(dtype=object),
+                                             raw_codes, positions, sizes)
+
+        # "least" negates, except in "at least" and "very least"
+        prev_least = prev(is_word('least'), 1, False) & ~prev(in_lexicon, 1, True)
+        exempt = prev(is_word('at', 'very'), 2, False)
+        valence = np.where(scored & prev_least & ~exempt, valence * self.n_scalar, valence)
+
+        # Repeated tokens take the valence of their first occurrence in the
+        # text, like SentiText's index lookup
+        occurrence, _ = pd.factorize(docs * len(raw_vocab) + raw_codes)
+        seen = np.concatenate(([-1], np.maximum.accumulate(occurrence)[:-1]))
+        first = np.flatnonzero(occurrence > seen)
+        valence = valence[first[occurrence]]
+
+        # "but" halves what precedes it and boosts what follows
+        is_but = is_word('but')
+        first_but = np.full(n_docs, np.iinfo(np.int64).max)
+        np.minimum.at(first_but, docs[is_but], positions[is_but])
+        but_at = first_but[docs]
+        has_but = but_at != np.iinfo(np.int64).max
+        valence = np.where(has_but & (positions < but_at), valence * 0.5,
+                           np.where(has_but & (positions > but_at), valence * 1.5, valence))
+
+        total = np.bincount(docs, weights=valence, minlength=n_docs)
+        pos_sum = np.bincount(docs, weights=np.where(valence > 0, valence + 1, 0.0), minlength=n_docs)
+        neg_sum = np.bincount(docs, weights=np.where(valence < 0, valence - 1, 0.0), minlength=n_docs)
+        neu_count = np.bincount(docs, weights=(valence == 0), minlength=n_docs)
+
+        exclamations = np.minimum(exclamations, 4) * 0.292
+        amplifier = exclamations + np.where(questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0.0)
+
+        total = total + np.sign(total) * amplifier
+        compound = total / np.sqrt(total * total + 15)
+        more_pos = pos_sum > np.abs(neg_sum)
+        more_neg = pos_sum < np.abs(neg_sum)
+        pos_sum = pos_sum + np.where(more_pos, amplifier, 0.0)
+        neg_sum = neg_sum - np.where(more_neg, amplifier, 0.0)
+
+        denominator = pos_sum + np.abs(neg_sum) + neu_count
+        has_tokens = counts > 0
+        safe = np.where(has_tokens, denominator, 1.0)
+
+        return pd.DataFrame({
+            'compound': self._round(np.where(has_tokens, compound, 0.0), 4),
+            'neg': self._round(np.where(has_tokens, np.abs(neg_sum / safe), 0.0), 3),
+            'neu': self._round(np.where(has_tokens, np.abs(neu_count / safe), 0.0), 3),
+            'pos': self._round(np.where(has_tokens, np.abs(pos_sum / safe), 0.0), 3),
+        })
+
+    def _vader_idioms(self, valence, applies, raw_vocab, raw_codes, positions, sizes):
+        """
+        VADER's special-case idioms ("the bomb", "kiss of death") around the
+        tokens where applies is set, then its "kind of"/"sort of" dampening
+        """
+        at = np.flatnonzero(applies)
+        if not len(at):
+            return valence
+        following = sizes[at] - positions[at] - 1
+
+        def phrase(*offsets):
+            tokens = [raw_vocab[raw_codes[np.clip(at + offset, 0, len(raw_codes) - 1)]] for offset in offsets]
+            text = tokens[0]
+            for token in tokens[1:]:
+                text = text + ' ' + token
+            return pd.Series(text, dtype=object)
+
+        # Earlier phrases take precedence, then ones starting at the token
+        idiom = np.full(len(at), np.nan)
+        for offsets, available in (((-3, -2), True), ((-3, -2, -1), True), ((-2, -1), True),
+                                   ((-2, -1, 0), True), ((-1, 0), True),
+                                   ((0, 1), following >= 1), ((0, 1, 2), following >= 2)):
+            value = phrase(*offsets).map(self.idioms).to_numpy(dtype=float, na_value=np.nan)
+            idiom = np.where(available & ~np.isnan(value), value, idiom)
+
+        updated = np.where(np.isnan(idiom), valence[at], idiom)
+        dampened = (phrase(-3, -2).isin(self.boosters) | phrase(-2, -1).isin(self.boosters)).to_numpy()
+        updated = updated + np.where(dampened, self.b_decr, 0.0)
+
+        valence = valence.copy()
+        valence[at] = updated
+        return valence
+
+    def _pattern_tokens(self, docs, codes, vocab, n_docs):
+        """
+        Lowercased tokens as TextBlob's pattern tokenizer (find_tokens) splits
+        them; each distinct whitespace-separated token is tokenized once
+        Returns: (doc ids, tokens)
+        """
+        pieces = [[token] if token.isalnum() else ' '.join(find_tokens(token)).split() for token in vocab]
+
+        # Emoticons and "(!)" split over two tokens (": )") are joined by a
+        # pass over the whole text, so such texts are rebuilt and tokenized
+        # as a whole
+        nonempty = np.array([bool(token_pieces) for token_pieces in pieces], dtype=bool)[codes]
+        docs, codes = docs[nonempty], codes[nonempty]
+        opens = np.array([bool(p) and p[-1] in self.mark_parts for p in pieces], dtype=bool)[codes]
+        closes = np.array([bool(p) and p[0] in self.mark_parts for p in pieces], dtype=bool)[codes]
+        spans = opens[:-1] & closes[1:] & (docs[:-1] == docs[1:])
+        joined = np.zeros(n_docs, dtype=bool)
+        joined[docs[:-1][spans]] = True
+        inside = joined[docs]
+
+        docs_out, words_out = self._expand(docs[~inside], codes[~inside],
+                                           [[piece.lower() for piece in p] for p in pieces])
+        if inside.any():
+            groups = np.split(codes[inside], np.flatnonzero(np.diff(docs[inside])) + 1)
+            texts = pd.Series([' '.join(chain.from_iterable(pieces[code] for code in group))
+                               for group in groups], dtype=object)
+            texts = texts.str.replace(RE_SARCASM, '(!)', regex=True)
+            texts = texts.str.replace(RE_EMOTICONS, lambda m: m.group(1).replace(' ', '') + m.group(2),
+                                      regex=True)
+            joined_docs, joined_words = self._split(texts.str.lower())
+            docs_out = np.concatenate((docs_out, np.flatnonzero(joined)[joined_docs]))
+            words_out = np.concatenate((words_out, joined_words))
+
+        order = np.argsort(docs_out, kind='stable')
+        return docs_out[order], words_out[order]
+
+    def _pattern_scores(self, docs, codes, vocab, n_docs):
+        """
+        TextBlob polarity and subjectivity, following the pattern analyzer's
+        assessments: known words start a chunk unless a modifier precedes
+        them ("very good"), a negation flips the chunk ("not good"), "!"
+        boosts the latest chunk and emoticons are chunks of their own
+        """
+        docs, words = self._pattern_tokens(docs, codes, vocab, n_docs)
+        positions, counts = self._flatten(docs, n_docs)
+        index = np.arange(len(words))
+        starts = index - positions
+
+        codes, vocab = self._vocabulary(words)
+        entries = vocab.map(self.pattern_scores)
+        known = entries.notna().to_numpy()[codes]
+        table = np.array([e if isinstance(e, (list, tuple)) else [0.0, 0.0, 1.0] for e in entries], dtype=float)
+        polarity, subjectivity, intensity = table.reshape(-1, 3)[codes].T
+        modifier = vocab.isin(self.pattern_modifiers).to_numpy()[codes] & known
+        negation = vocab.isin(self.pattern_negations).to_numpy()[codes]
+        ends_ly = vocab.str.endswith('ly').to_numpy(dtype=bool)[codes]
+        long_word = (vocab.str.len() > 2).to_numpy()[codes]
+        short_word = (vocab.str.strip("'").str.len() <= 1).to_numpy()[codes]
+        emoticon = vocab.map(self.pattern_emoticons).to_numpy(dtype=float, na_value=np.nan)[codes]
+        unknown = ~known
+        is_emoticon = unknown & ~np.isnan(emoticon)
+        sarcasm = unknown & (vocab == '(!)').to_numpy()[codes]
+        exclaim = unknown & (vocab == '!').to_numpy()[codes]
+
+        def at(values, positions_):
+            return values[np.maximum(positions_, 0)]
+
+        # A known modifier stays active across small words ("really is a
+        # good"); an unknown negation after an -ly modifier is attached to
+        # the modifier's chunk and keeps it active ("really not good")
+        last_known = self._last_before(known, index, starts)
+        has_known = last_known >= 0
+        attaches_negation = unknown & negation & at(ends_ly, last_known)
+        breaks = np.cumsum(unknown & long_word & ~attaches_negation)
+        intervening = np.where(has_known, at(breaks, index - 1) - at(breaks, last_known), 0)
+        modified = has_known & at(modifier, last_known) & (intervening == 0)
+        joins = known & modified
+        attached = attaches_negation & modified
+
+        # A negation stays pending across small words ("not a good") until
+        # the next known word or word of two or more letters
+        sets_negation = np.where(known, negation, negation & ~attached)
+        last_event = self._last_before(known | negation | ~short_word, index, starts)
+        negated = (last_event >= 0) & at(sets_negation, last_event)
+
+        # Chunks: each known word not joining a modifier, emoticon and "(!)"
+        starts_chunk = (known & ~joins) | is_emoticon | sarcasm
+        chunk = np.cumsum(starts_chunk) - 1
+        chunk_docs = docs[starts_chunk]
+        n_chunks = len(chunk_docs)
+        if not n_chunks:
+            return pd.DataFrame({'polarity': np.zeros(n_docs), 'subjectivity': np.zeros(n_docs)})
+        has_chunk = (chunk >= 0) & (at(chunk_docs, chunk) == docs)
+
+        # Intensity each member leaves on its chunk; a negated word inverts it
+        member = known | starts_chunk
+        member_intensity = np.where(known, intensity, 1.0)
+        member_intensity = np.where(known & negated, 1.0 / member_intensity, member_intensity)
+        previous = self._last_before(member, index, starts)
+        scale = np.where(joins, at(member_intensity, previous), 1.0)
+        member_polarity = np.where(known, polarity, np.where(is_emoticon, emoticon, 0.0))
+        member_subjectivity = np.where(known, subjectivity, 1.0)
+        member_polarity = np.where(joins, np.clip(member_polarity * scale, -1, 1), member_polarity)
+        member_subjectivity = np.where(joins, np.clip(member_subjectivity * scale, -1, 1), member_subjectivity)
+
+        # A chunk scores as its last member
+        last_member = np.full(n_chunks, -1)
+        np.maximum.at(last_member, chunk[member], index[member])
+        chunk_polarity = member_polarity[last_member]
+        chunk_subjectivity = member_subjectivity[last_member]
+
+        # "!" boosts the latest chunk, unless a later word joins it
+        boosted = exclaim & has_chunk
+        boosted &= index > at(last_member, chunk)
+        boosts = np.bincount(chunk[boosted], minlength=n_chunks)
+        for step in range(1, int(boosts.max(initial=0)) + 1):
+            active = boosts >= step
+            chunk_polarity = np.where(active, np.clip(chunk_polarity * 1.25, -1, 1), chunk_polarity)
+            if not np.any(active & (np.abs(chunk_polarity) < 1) & (chunk_polarity != 0)):
+                break
+
+        # "not good" is slightly bad, "not bad" slightly good
+        flipped = np.zeros(n_chunks, dtype=bool)
+        flipped[chunk[(known & negated) | attached]] = True
+        chunk_polarity = np.where(flipped, chunk_polarity * -0.5, chunk_polarity)
+
+        count = np.bincount(chunk_docs, minlength=n_docs)
+        safe = np.where(count > 0, count, 1)
+        return pd.DataFrame({
+            'polarity': np.bincount(chunk_docs, weights=chunk_polarity, minlength=n_docs) / safe,
+            'subjectivity': np.bincount(chunk_docs, weights=chunk_subjectivity, minlength=n_docs) / safe,
+        })
+
+    def _emotions(self, texts, docs, codes, vocab, n_docs):
+        """
+        Emotion with the most distinct keywords present in each text
+        """
+        neutral = self.emotion_labels.index('Neutral')
+        if self.emotion_matcher.max_length > 1:
+            # Phrase lexicons need the matcher's n-gram lookup
+            best = [self.emotion_matcher.detect(text) for text in texts]
+            codes = [neutral if emotion is None else self.emotion_labels.index(emotion.capitalize())
+                     for emotion in best]
+            return pd.DataFrame({'emotion': pd.Categorical.from_codes(codes, categories=self.emotion_labels)})
+
+        # Keywords in each distinct token; each distinct keyword counts once per text
+        found = [[self.keywords[word] for word in TOKEN_PATTERN.findall(token.lower()) if word in self.keywords]
+                 for token in vocab]
+        hit_docs, hits = self._expand(docs, codes, found)
+        hits = np.unique(hit_docs * len(self.keywords) + hits.astype(np.int64))
+        counts = np.zeros((n_docs, len(self.emotion_labels)), dtype=np.int64)
+        np.add.at(counts, hits // len(self.keywords), self.keyword_emotions[hits % len(self.keywords)])
+
+        best = np.where(counts.any(axis=1), counts.argmax(axis=1), neutral)
+        return pd.DataFrame({'emotion': pd.Categorical.from_codes(best, categories=self.emotion_labels)})
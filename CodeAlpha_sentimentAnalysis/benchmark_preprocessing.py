@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled text preprocessor against the original preprocess_text
+
+Usage:
+    python benchmark_preprocessing.py [--repeat N] [--length WORDS]
+"""
+
+import argparse
+import re
+import time
+
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from preprocessing import TextPreprocessor
+from utils import TextUtils
+
+
+def reference_preprocess(text, stop_words):
+    """
+    The original three-substitution preprocess_text, kept as the baseline
+    """
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'@\w+|#\w+', '', text)
+    text = re.sub(r'[^a-zA-Z\s]', '', text)
+    tokens = word_tokenize(text)
+    tokens = [word for word in tokens if word not in stop_words and len(word) > 2]
+    return ' '.join(tokens)
+
+
+def build_corpus(length):
+    """
+    Sample reviews plus long documents with URLs, mentions and hashtags
+    """
+    samples = TextUtils.get_sample_texts()
+    extras = ["Check https://example.com/item?id=42 and www.shop.example now!",
+              "@support #fail why can't y'all fix this?! 10/10 would NOT buy again...",
+              "I cannot believe you are gonna ship this, wanna refund. Don't bother."]
+    document = ' '.join((samples + extras) * (length // 120 + 1))
+    return samples + extras + [document] * 20
+
+
+def benchmark(preprocess, corpus, repeat):
+    """
+    Seconds taken to preprocess the corpus repeat times
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            preprocess(text)
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Time each implementation, check they agree and print the speedup
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    arg_parser.add_argument('--length', type=int, default=2000,
+                            help='approximate words per long document')
+    args = arg_parser.parse_args()
+
+    stop_words = set(stopwords.words('english'))
+    corpus = build_corpus(args.length)
+    candidates = {
+        'reference': lambda text: reference_preprocess(text, stop_words),
+        'compiled': TextPreprocessor(stop_words),
+        'compiled+fast': TextPreprocessor(stop_words, fast_tokenizer=True),
+    }
+
+    expected = [candidates['reference'](text) for text in corpus]
+    words = sum(len(text.split()) for text in corpus) * args.repeat
+    baseline = None
+    print(f"{len(corpus)} texts x {args.repeat} repeats, {words} words")
+    print(f"{'implementation':<16} {'seconds':>8} {'words/s':>10} {'speedup':>8} {'matches':>8}")
+
+    for name, preprocess in candidates.items():
+        matches = [preprocess(text) for text in corpus] == expected
+        seconds = benchmark(preprocess, corpus, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<16} {seconds:>8.3f} {words / seconds:>10.0f} "
+              f"{baseline / seconds:>7.1f}x {str(matches):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import math
+import threading
+import time
+from datetime import datetime
+from enum import IntEnum
+
+import numpy as np
+
+NAN = float('nan')
+
+EMOTION_ICONS = {
+    'Happy': '😊',
+    'Sad': '😢',
+    'Angry': '😠',
+    'Fearful': '😨',
+    'Surprised': '😲',
+    'Neutral': '😐'
+}
+
+# Emotion label <-> small integer code, shared by every result; custom
+# emotions are registered on first use
+EMOTION_LABELS = list(EMOTION_ICONS)
+_EMOTION_CODES = {label: code for code, label in enumerate(EMOTION_LABELS)}
+_emotion_lock = threading.Lock()
+
+
+def emotion_code(label):
+    """Code of an emotion label, registering new labels"""
+    code = _EMOTION_CODES.get(label)
+    if code is None:
+        with _emotion_lock:
+            code = _EMOTION_CODES.get(label)
+            if code is None:
+                EMOTION_LABELS.append(label)
+                code = _EMOTION_CODES[label] = len(EMOTION_LABELS) - 1
+    return code
+
+
+class Sentiment(IntEnum):
+    """Sentiment label stored as a small integer"""
+    POSITIVE = 0
+    NEGATIVE = 1
+    NEUTRAL = 2
+    
+    @classmethod
+    def from_compound(cls, compound):
+        """Label for a compound score, with the usual +/-0.05 thresholds"""
+        if compound >= 0.05:
+            return cls.POSITIVE
+        if compound <= -0.05:
+            return cls.NEGATIVE
+        return cls.NEUTRAL
+    
+    @property
+    def label(self):
+        return self.name.capitalize()
+    
+    @property
+    def icon(self):
+        return ('😊', '😠', '😐')[self]
+    
+    @property
+    def color(self):
+        return ('success', 'danger', 'info')[self]
+
+
+SENTIMENTS = tuple(Sentiment)
+
+
+class CompactResult:
+    # Scores only: no text copies, no nested dict, no formatted timestamp;
+    # the labels are stored as integer codes
+    __slots__ = ('_sentiment', 'confidence', 'compound', 'neg', 'neu', 'pos',
+                 'polarity', 'subjectivity', '_emotion', 'word_count', 'char_count',
+                 'created')
+    FIELDS = ('sentiment', 'confidence', 'compound', 'neg', 'neu', 'pos',
+              'polarity', 'subjectivity', 'emotion', 'word_count', 'char_count',
+              'created')
+    
+    def __init__(self, sentiment, confidence, compound, neg=NAN, neu=NAN, pos=NAN,
+                 polarity=NAN, subjectivity=NAN, emotion='Neutral', word_count=0,
+                 char_count=0, created=None):
+        """
+        Memory-light analysis result
+
+        sentiment is a Sentiment enum and emotion a label; both are kept as
+        small integer codes. Scores an engine did not compute are NaN.
+        Presentation fields (icons, colors, timestamp string) are only
+        produced by to_dict(), at the HTTP edge.
+
+        A result takes about 320 bytes (the object and its float scores)
+        against about 1.2 KB for the analyze_sentiment dict; for a tenfold
+        saving store many results in a ResultBatch (about 50 bytes each).
+        """
+        self._sentiment = int(Sentiment(sentiment))
+        self.confidence = confidence
+        self.compound = compound
+        self.neg = neg
+        self.neu = neu
+        self.pos = pos
+        self.polarity = polarity
+        self.subjectivity = subjectivity
+        self._emotion = emotion_code(emotion)
+        self.word_count = word_count
+        self.char_count = char_count
+        self.created = time.time() if created is None else created
+    
+    @property
+    def sentiment(self):
+        return SENTIMENTS[self._sentiment]
+    
+    @property
+    def emotion(self):
+        return EMOTION_LABELS[self._emotion]
+    
+    def __reduce__(self):
+        # Emotion codes are per process, so pickle the labels
+        return self.from_row, (self.to_row(),)
+    
+    def __repr__(self):
+        return (f"CompactResult({self.sentiment.label}, confidence={self.confidence}, "
+                f"emotion={self.emotion})")
+    
+    def __eq__(self, other):
+        if not isinstance(other, CompactResult):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+    
+    def to_row(self):
+        """
+        Plain list of the field values (JSON-friendly: sentiment as int,
+        emotion as its label)
+        """
+        return [self._sentiment] + [getattr(self, name) for name in self.FIELDS[1:]]
+    
+    @classmethod
+    def from_row(cls, row):
+        """
+        Rebuild a result from to_row() output
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Results for the rows of a score_batch() DataFrame
+        """
+        created = time.time()
+        return [
+            cls(Sentiment[row.sentiment.upper()], row.confidence, row.compound, row.neg,
+                row.neu, row.pos, row.polarity, row.subjectivity, row.emotion,
+                int(row.word_count), int(row.char_count), created)
+            for row in frame.itertuples(index=False)
+        ]
+    
+    def to_dict(self, text=None):
+        """
+        Render the full presentation dict analyze_sentiment returns
+        processed_text and text_preview are only included when text is given
+        """
+        result = {
+            'sentiment': self.sentiment.label,
+            'sentiment_icon': self.sentiment.icon,
+            'color': self.sentiment.color,
+            'confidence': round(self.confidence, 2),
+        }
+        if not math.isnan(self.polarity):
+            result['polarity'] = round(self.polarity, 3)
+            result['subjectivity'] = round(self.subjectivity, 3)
+        result['emotion'] = self.emotion
+        result['emotion_icon'] = EMOTION_ICONS.get(self.emotion, '😐')
+        result['word_count'] = self.word_count
+        result['char_count'] = self.char_count
+        if not math.isnan(self.neg):
+            result['vader_scores'] = {'neg': round(self.neg, 3), 'neu': round(self.neu, 3),
+                                      'pos': round(self.pos, 3), 'compound': round(self.compound, 4)}
+        result['timestamp'] = datetime.fromtimestamp(self.created).strftime("%Y-%m-%d %H:%M:%S")
+        if text is not None:
+            result['text_preview'] = (text[:200] + '...') if len(text) > 200 else text
+        return result
+
+
+class ResultBatch:
+    # Float score columns, stored as float32
+    FLOAT_COLUMNS = ('confidence', 'compound', 'neg', 'neu', 'pos', 'polarity', 'subjectivity')
+    
+    def __init__(self, capacity=1024):
+        """
+        Struct-of-arrays container for many results: one NumPy array per
+        field and integer-coded labels, about 50 bytes per result
+        """
+        self.size = 0
+        self.sentiment = np.zeros(capacity, dtype=np.int8)
+        self.emotion = np.zeros(capacity, dtype=np.int16)
+        self.word_count = np.zeros(capacity, dtype=np.int32)
+        self.char_count = np.zeros(capacity, dtype=np.int32)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        for name in self.FLOAT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float32))
+    
+    def _columns(self):
+        return ('sentiment', 'emotion', 'word_count', 'char_count', 'created') + self.FLOAT_COLUMNS
+    
+    def _grow(self):
+        """
+        Double the capacity of every column
+        """
+        for name in self._columns():
+            column = getattr(self, name)
+            grown = np.zeros(max(len(column) * 2, 16), dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+    
+    def append(self, result):
+        """
+        Add a CompactResult
+        """
+        if self.size == len(self.sentiment):
+            self._grow()
+        i = self.size
+        self.sentiment[i] = result._sentiment
+        self.emotion[i] = result._emotion
+        self.word_count[i] = result.word_count
+        self.char_count[i] = result.char_count
+        self.created[i] = result.created
+        for name in self.FLOAT_COLUMNS:
+            getattr(self, name)[i] = getattr(result, name)
+        self.size += 1
+    
+    def extend(self, results):
+        """
+        Add several CompactResults
+        """
+        for result in results:
+            self.append(result)
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, i):
+        """
+        Result i as a CompactResult
+        """
+        if not -self.size <= i < self.size:
+            raise IndexError('result index out of range')
+        i %= self.size
+        return CompactResult(
+            int(self.sentiment[i]),
+            *(float(getattr(self, name)[i]) for name in self.FLOAT_COLUMNS),
+            emotion=EMOTION_LABELS[self.emotion[i]],
+            word_count=int(self.word_count[i]),
+            char_count=int(self.char_count[i]),
+            created=float(self.created[i])
+        )
+    
+    def __iter__(self):
+        return (self[i] for i in range(self.size))
+    
+    def sentiment_counts(self):
+        """
+        Number of results per sentiment label
+        """
+        counts = np.bincount(self.sentiment[:self.size], minlength=len(Sentiment))
+        return {sentiment.label: int(counts[sentiment]) for sentiment in Sentiment}
+    
+    def nbytes(self):
+        """
+        Bytes held by the column arrays (in use)
+        """
+        return sum(getattr(self, name)[:self.size].nbytes for name in self._columns())
+    
+    def to_frame(self):
+        """
+        Results as a pandas DataFrame with categorical labels
+        """
+        import pandas as pd
+        n = self.size
+        frame = pd.DataFrame({
+            'sentiment': pd.Categorical.from_codes(self.sentiment[:n], [s.label for s in Sentiment]),
+            **{name: getattr(self, name)[:n] for name in self.FLOAT_COLUMNS},
+            'emotion': pd.Categorical.from_codes(self.emotion[:n], list(EMOTION_LABELS)),
+            'word_count': self.word_count[:n],
+            'char_count': self.char_count[:n],
+        })
+        return frame
@@ -0,0 +1,16 @@
+from phrase_matcher import PhraseMatcher
+
+
+class EmotionMatcher(PhraseMatcher):
+    def __init__(self, emotion_keywords):
+        """
+        Phrase matcher over an emotion lexicon ({emotion: [keyword, ...]})
+        """
+        super().__init__(emotion_keywords)
+    
+    @property
+    def emotions(self):
+        """
+        Emotion names, in lexicon order
+        """
+        return self.labels
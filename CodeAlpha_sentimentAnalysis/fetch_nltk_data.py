@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Download the NLTK resources the analyzer needs into the bundled nltk_data/
+directory, so the app can run with SENTIMENT_OFFLINE=1 (no network access)
+
+Usage:
+    python fetch_nltk_data.py [target_dir]
+"""
+
+import sys
+
+import nltk
+
+from sentiment_analyzer import NLTK_DATA_DIR, NLTK_RESOURCES
+
+
+def main():
+    """Fetch every resource into the target directory"""
+    target = sys.argv[1] if len(sys.argv) > 1 else NLTK_DATA_DIR
+    for names, _ in NLTK_RESOURCES:
+        for name in names:
+            ok = nltk.download(name, download_dir=target, quiet=True)
+            print(f"{'✅' if ok else '⚠️ '} {name}")
+    print(f"NLTK data bundled in {target}")
+
+
+if __name__ == "__main__":
+    main()
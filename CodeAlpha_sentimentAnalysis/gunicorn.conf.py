@@ -0,0 +1,53 @@
+"""
+gunicorn configuration for serving the sentiment app in production
+
+    gunicorn -c gunicorn.conf.py
+
+Environment overrides: SENTIMENT_BIND, SENTIMENT_WORKERS, SENTIMENT_THREADS,
+SENTIMENT_TIMEOUT, SENTIMENT_MAX_REQUESTS. Send SIGHUP to the master for a
+graceful reload (new workers start before old ones finish their requests).
+Because the app is preloaded, deploying new code needs SIGUSR2 (start a new
+master) followed by SIGTERM to the old one, or a restart.
+"""
+
+import multiprocessing
+import os
+
+# Workers are separate processes: keep results and jobs in a shared store
+os.environ.setdefault('RESULT_STORE_DB', 'results.sqlite')
+
+wsgi_app = 'wsgi:application'
+bind = os.environ.get('SENTIMENT_BIND', '0.0.0.0:5000')
+
+# Load the app (and the analyzer's lexicons) once in the master, then fork
+preload_app = True
+
+workers = int(os.environ.get('SENTIMENT_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('SENTIMENT_THREADS', 4))
+
+timeout = int(os.environ.get('SENTIMENT_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.environ.get('SENTIMENT_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Give each worker its own SQLite connections"""
+    from app import cache, store, job_store, rolling
+    cache.reopen()
+    store.reopen()
+    job_store.reopen()
+    rolling.reopen()
+
+
+def worker_exit(server, worker):
+    """Let running batch jobs finish before the worker goes away"""
+    from app import jobs
+    jobs.shutdown()
@@ -0,0 +1,66 @@
+import re
+
+# Words (with an optional contraction suffix) as the matcher sees them
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+class PhraseMatcher:
+    def __init__(self, lexicon):
+        """
+        Precompile a lexicon ({label: [term or phrase, ...]}) into a hashed
+        phrase table
+
+        Terms may be single words or multi-word phrases. Text is tokenized
+        once and every phrase starting at each token is looked up in a dict,
+        so matching costs O(tokens x longest phrase) however large the
+        lexicon is, and only whole words match ("mad" does not hit "made").
+        """
+        self.labels = list(lexicon)
+        self.phrases = {}
+        for index, terms in enumerate(lexicon.values()):
+            for term in terms:
+                phrase = tuple(TOKEN_PATTERN.findall(term.lower()))
+                if phrase:
+                    self.phrases.setdefault(phrase, set()).add(index)
+        self.max_length = max((len(phrase) for phrase in self.phrases), default=0)
+    
+    def tokenize(self, text):
+        """
+        Lowercased word tokens of the text
+        """
+        return TOKEN_PATTERN.findall(text.lower())
+    
+    def match(self, text):
+        """
+        Distinct terms found in the text
+        Returns: Set of matched phrases (as token tuples)
+        """
+        tokens = self.tokenize(text)
+        found = set()
+        for start in range(len(tokens)):
+            for length in range(1, min(self.max_length, len(tokens) - start) + 1):
+                phrase = tuple(tokens[start:start + length])
+                if phrase in self.phrases:
+                    found.add(phrase)
+        return found
+    
+    def counts(self, text):
+        """
+        Number of distinct terms found per label, in lexicon order
+        """
+        scores = [0] * len(self.labels)
+        for phrase in self.match(text):
+            for index in self.phrases[phrase]:
+                scores[index] += 1
+        return dict(zip(self.labels, scores))
+    
+    def detect(self, text):
+        """
+        Label with the most term hits, the earliest one on ties
+        Returns: Label, or None when no term matched
+        """
+        best, best_count = None, 0
+        for label, count in self.counts(text).items():
+            if count > best_count:
+                best, best_count = label, count
+        return best
@@ -0,0 +1,54 @@
+import re
+
+# What preprocess_text strips from lowercased text, applied in this order:
+# URLs, then mentions and hashtags, then runs of anything that is not a
+# letter or whitespace. Separate simple patterns are much faster than one
+# alternation, which has to try every branch at every character.
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+TAG_PATTERN = re.compile(r'[@#]\w+')
+NON_LETTER_PATTERN = re.compile(r'[^a-z\s]+')
+
+
+def word_tokenize(text):
+    """
+    NLTK's word_tokenize, imported on first use to keep start-up fast
+    """
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    return nltk_word_tokenize(text)
+
+
+class TextPreprocessor:
+    def __init__(self, stop_words, fast_tokenizer=False, min_length=3):
+        """
+        Text cleaning with precompiled patterns that remove URLs, mentions,
+        hashtags and non-letters, then tokens are split and filtered
+        against the stopword set in a single comprehension
+
+        With fast_tokenizer=True tokens are split on whitespace instead of
+        going through NLTK's word_tokenize. This is much faster but not
+        identical: word_tokenize still splits some words ("cannot" into
+        "can not", "gonna" into "gon na"), so its stopword filter differs.
+        """
+        self.stop_words = frozenset(stop_words)
+        self.min_length = min_length
+        self.tokenize = str.split if fast_tokenizer else word_tokenize
+    
+    def tokens(self, text):
+        """
+        Cleaned, stopword-free tokens of the text
+        """
+        if not text:
+            return []
+        
+        cleaned = URL_PATTERN.sub('', text.lower())
+        cleaned = TAG_PATTERN.sub('', cleaned)
+        cleaned = NON_LETTER_PATTERN.sub('', cleaned)
+        stop_words, min_length = self.stop_words, self.min_length
+        return [word for word in self.tokenize(cleaned)
+                if len(word) >= min_length and word not in stop_words]
+    
+    def __call__(self, text):
+        """
+        Preprocessed text as a space-separated string
+        """
+        return ' '.join(self.tokens(text))
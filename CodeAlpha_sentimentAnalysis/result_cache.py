@@ -0,0 +1,163 @@
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    Normalize text for cache lookups: Unicode NFC, collapsed whitespace
+    Case is kept because VADER scores capitalized words differently
+    """
+    return WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+class ResultCache:
+    def __init__(self, max_entries=10000, ttl=None, path=None):
+        """
+        Bounded LRU cache of analysis results with an optional TTL
+
+        Results are keyed by a hash of the normalized text plus the engine
+        and fields requested. With path set, entries are also stored in a
+        SQLite database that several processes can share: a miss in memory
+        falls back to the database before the text is analyzed again.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        if path:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )"""
+            )
+            if ttl:
+                self._conn.execute("DELETE FROM results WHERE stored_at < ?", (time.time() - ttl,))
+            self._conn.commit()
+    
+    @staticmethod
+    def key(text, engine='both', fields=None):
+        """
+        Cache key for a text analyzed with an engine and set of fields
+        """
+        scope = f"{engine}\0{','.join(fields or ())}\0{normalize_text(text)}"
+        return hashlib.blake2b(scope.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+    
+    def get(self, key):
+        """
+        Cached result for key, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(result)
+                del self._entries[key]
+                self.expirations += 1
+            
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, stored_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    result = json.loads(row[0])
+                    self._store(key, result, row[1])
+                    self.hits += 1
+                    return copy.deepcopy(result)
+            
+            self.misses += 1
+            return None
+    
+    def set(self, key, result):
+        """
+        Cache a result (a copy is stored)
+        """
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, copy.deepcopy(result), stored_at)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                    (key, json.dumps(result), stored_at)
+                )
+                self._conn.commit()
+    
+    def _store(self, key, result, stored_at):
+        """
+        Put an entry in the in-memory LRU, evicting the oldest past the limit
+        """
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """
+        Drop every cached result, including the shared database
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+    
+    def stats(self):
+        """
+        Hit/miss statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'shared': self.path is not None
+            }
+    
+    def reopen(self):
+        """
+        Open a fresh database connection, e.g. in a forked worker process
+        (SQLite connections must not be shared across a fork)
+        """
+        with self._lock:
+            if self.path:
+                self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+    
+    def close(self):
+        """
+        Close the shared database, if any
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
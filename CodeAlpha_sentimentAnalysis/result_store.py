@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class MemoryResultStore:
+    def __init__(self, max_entries=10000, ttl=3600):
+        """
+        Server-side store for analysis results, kept in this process
+
+        Values are stored JSON-encoded (so callers never share mutable
+        state with the store); the least recently used entries are evicted
+        past max_entries (never, if it is None) and entries expire after
+        ttl seconds. Expired entries are purged on every 1000th save.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._saves = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _purge(self):
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            for key in [key for key, (stored_at, _) in self._entries.items() if stored_at < cutoff]:
+                del self._entries[key]
+    
+    def save(self, value, key=None):
+        """
+        Store a JSON-serializable value
+        Returns: The key it can be loaded with (a new id unless given)
+        """
+        key = key or uuid.uuid4().hex
+        encoded = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (time.time(), encoded)
+            self._entries.move_to_end(key)
+            self._saves += 1
+            if self._saves % 1000 == 0:
+                self._purge()
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return key
+    
+    def load(self, key):
+        """
+        Stored value for key, or None if unknown or expired
+        """
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, encoded = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(encoded)
+    
+    def delete(self, key):
+        """
+        Remove a stored value
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def reopen(self):
+        """
+        Nothing to reopen; each process has its own entries
+        """
+
+
+class SQLiteResultStore:
+    def __init__(self, path="results.sqlite", ttl=3600):
+        """
+        Server-side result store in a SQLite database
+
+        Shared by every process pointing at the same file, so any worker
+        can serve results produced by another. Expired rows are purged
+        when the store is opened and on every 1000th save.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._saves = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )"""
+        )
+        self._purge()
+    
+    def _purge(self):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM results WHERE stored_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+    
+    def save(self, value, key=None):
+        """
+        Store a JSON-serializable value
+        Returns: The key it can be loaded with (a new id unless given)
+        """
+        key = key or uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._saves += 1
+            if self._saves % 1000 == 0:
+                self._purge()
+            else:
+                self._conn.commit()
+        return key
+    
+    def load(self, key):
+        """
+        Stored value for key, or None if unknown or expired
+        """
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return None
+        return json.loads(row[0])
+    
+    def delete(self, key):
+        """
+        Remove a stored value
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def reopen(self):
+        """
+        Open a fresh database connection, e.g. in a forked worker process
+        (SQLite connections must not be shared across a fork)
+        """
+        with self._lock:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+    
+    def close(self):
+        """
+        Close the underlying database
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def open_result_store(path=None, ttl=3600, max_entries=10000):
+    """
+    SQLite-backed store when a path is given, otherwise an in-memory one
+    holding at most max_entries (None: no limit; SQLite stores only expire)
+    """
+    if path:
+        return SQLiteResultStore(path, ttl=ttl)
+    return MemoryResultStore(max_entries=max_entries, ttl=ttl)
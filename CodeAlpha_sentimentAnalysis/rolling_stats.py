@@ -0,0 +1,311 @@
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from compact_result import CompactResult
+
+SENTIMENT_LABELS = ('Positive', 'Negative', 'Neutral')
+
+
+def window_state(seconds, sentiment_counts, compound_sum, compound_count, emotion_counts):
+    """
+    Counts, percentages, mean compound and emotion distribution of a window
+    """
+    total = sum(sentiment_counts.values())
+    return {
+        'window_seconds': seconds,
+        'count': total,
+        'sentiment_counts': dict(sentiment_counts),
+        'percentages': {
+            label: round(n / total * 100, 2) if total else 0.0
+            for label, n in sentiment_counts.items()
+        },
+        'overall_sentiment': (max(sentiment_counts.items(), key=lambda x: x[1])[0]
+                              if total else None),
+        'mean_compound': round(compound_sum / compound_count, 4) if compound_count else 0.0,
+        'emotion_distribution': {
+            emotion: round(n / total * 100, 2)
+            for emotion, n in sorted(emotion_counts.items(), key=lambda x: -x[1])
+        } if total else {},
+    }
+
+
+def result_fields(result):
+    """
+    (sentiment, VADER compound or None, emotion) of an analyze_sentiment
+    dict or a CompactResult
+
+    Only VADER compounds are averaged: a CompactResult's compound is the
+    score of the engine that labelled it (TextBlob polarity, the linear
+    model's tanh, ...), so it counts only when the VADER scores were kept.
+    """
+    if isinstance(result, CompactResult):
+        compound = None if math.isnan(result.neg) else result.compound
+        return result.sentiment.label, compound, result.emotion
+    vader_scores = result.get('vader_scores')
+    compound = vader_scores['compound'] if vader_scores else None
+    return result['sentiment'], compound, result.get('emotion')
+
+
+class SlidingWindow:
+    def __init__(self, seconds, resolution=1.0):
+        """
+        Running aggregates over the last `seconds`, kept in time buckets
+
+        Each new result updates the newest bucket and the running totals;
+        buckets that fall out of the window are subtracted from the totals,
+        so every update is O(1) amortized and memory is bounded by
+        seconds / resolution buckets, however fast texts arrive. Results
+        leave the window to within one bucket (resolution seconds).
+        """
+        self.seconds = seconds
+        self.resolution = resolution
+        self._buckets = deque()
+        self.count = 0
+        self.sentiment_counts = dict.fromkeys(SENTIMENT_LABELS, 0)
+        self.compound_sum = 0.0
+        self.compound_count = 0
+        self.emotion_counts = {}
+    
+    def _apply(self, bucket, sign):
+        """
+        Add (sign=1) or remove (sign=-1) a bucket's counts from the totals
+        """
+        _, count, sentiments, compound_sum, compound_count, emotions = bucket
+        self.count += sign * count
+        for label, n in sentiments.items():
+            self.sentiment_counts[label] += sign * n
+        self.compound_sum += sign * compound_sum
+        self.compound_count += sign * compound_count
+        for emotion, n in emotions.items():
+            total = self.emotion_counts.get(emotion, 0) + sign * n
+            if total:
+                self.emotion_counts[emotion] = total
+            else:
+                self.emotion_counts.pop(emotion, None)
+    
+    def expire(self, now):
+        """
+        Drop buckets older than the window
+        """
+        horizon = now - self.seconds
+        while self._buckets and self._buckets[0][0] + self.resolution <= horizon:
+            self._apply(self._buckets.popleft(), -1)
+    
+    def add(self, sentiment, compound, emotion, now):
+        """
+        Count one result at time now
+        """
+        self.expire(now)
+        start = now - now % self.resolution
+        if not self._buckets or self._buckets[-1][0] != start:
+            self._buckets.append([start, 0, {}, 0.0, 0, {}])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2][sentiment] = bucket[2].get(sentiment, 0) + 1
+        if compound is not None:
+            bucket[3] += compound
+            bucket[4] += 1
+        if emotion:
+            bucket[5][emotion] = bucket[5].get(emotion, 0) + 1
+        
+        self.count += 1
+        self.sentiment_counts[sentiment] += 1
+        if compound is not None:
+            self.compound_sum += compound
+            self.compound_count += 1
+        if emotion:
+            self.emotion_counts[emotion] = self.emotion_counts.get(emotion, 0) + 1
+    
+    def state(self, now):
+        """
+        Current counts, percentages, mean compound and emotion distribution
+        """
+        self.expire(now)
+        return window_state(self.seconds, self.sentiment_counts, self.compound_sum,
+                            self.compound_count, self.emotion_counts)
+
+
+class RollingSentimentAggregator:
+    def __init__(self, windows=(60, 300, 3600), resolution=1.0):
+        """
+        Thread-safe running aggregates over several sliding time windows
+        """
+        self.windows = [SlidingWindow(seconds, resolution) for seconds in windows]
+        self.total = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def add(self, sentiment, compound=None, emotion=None, timestamp=None):
+        """
+        Count one scored text; compound may be None when it was not computed
+        """
+        if sentiment not in SENTIMENT_LABELS:
+            raise ValueError(f"Unknown sentiment '{sentiment}'")
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self.total += 1
+            for window in self.windows:
+                window.add(sentiment, compound, emotion, now)
+    
+    def add_result(self, result, timestamp=None):
+        """
+        Count an analyze_sentiment dict or a CompactResult
+        """
+        self.add(*result_fields(result), timestamp=timestamp)
+    
+    def state(self, now=None):
+        """
+        Current state of every window
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                'total_texts': self.total,
+                'uptime_seconds': round(now - self.started, 1),
+                'windows': {f'{w.seconds}s': w.state(now) for w in self.windows},
+            }
+    
+    def reopen(self):
+        """
+        Nothing to reopen; each process has its own windows
+        """
+
+
+class SQLiteRollingAggregator:
+    def __init__(self, path="results.sqlite", windows=(60, 300, 3600), resolution=1.0):
+        """
+        Running aggregates over several sliding time windows, kept in SQLite
+
+        Every process pointing at the same file counts into the same time
+        buckets (one row per bucket, sentiment and emotion), so each window
+        covers the traffic of all workers. A window's state sums its buckets
+        when polled; buckets older than the longest window are purged then
+        and on every 1000th result.
+        """
+        self.path = path
+        self.seconds = list(windows)
+        self.resolution = resolution
+        self._adds = 0
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS rolling_buckets (
+                start REAL NOT NULL,
+                sentiment TEXT NOT NULL,
+                emotion TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                compound_sum REAL NOT NULL,
+                compound_count INTEGER NOT NULL,
+                PRIMARY KEY (start, sentiment, emotion)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS rolling_totals (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("INSERT OR IGNORE INTO rolling_totals VALUES ('total', 0)")
+        self._conn.execute("INSERT OR IGNORE INTO rolling_totals VALUES ('started', ?)", (time.time(),))
+        self._conn.commit()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _purge(self, now):
+        self._conn.execute("DELETE FROM rolling_buckets WHERE start + ? <= ?",
+                           (self.resolution, now - max(self.seconds)))
+    
+    def add(self, sentiment, compound=None, emotion=None, timestamp=None):
+        """
+        Count one scored text; compound may be None when it was not computed
+        """
+        if sentiment not in SENTIMENT_LABELS:
+            raise ValueError(f"Unknown sentiment '{sentiment}'")
+        now = time.time() if timestamp is None else timestamp
+        start = now - now % self.resolution
+        compound_sum, compound_count = (0.0, 0) if compound is None else (compound, 1)
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO rolling_buckets VALUES (?, ?, ?, 1, ?, ?)
+                   ON CONFLICT (start, sentiment, emotion) DO UPDATE SET
+                       count = count + 1,
+                       compound_sum = compound_sum + excluded.compound_sum,
+                       compound_count = compound_count + excluded.compound_count""",
+                (start, sentiment, emotion or '', compound_sum, compound_count)
+            )
+            self._conn.execute("UPDATE rolling_totals SET value = value + 1 WHERE name = 'total'")
+            self._adds += 1
+            if self._adds % 1000 == 0:
+                self._purge(now)
+            self._conn.commit()
+    
+    def add_result(self, result, timestamp=None):
+        """
+        Count an analyze_sentiment dict or a CompactResult
+        """
+        self.add(*result_fields(result), timestamp=timestamp)
+    
+    def state(self, now=None):
+        """
+        Current state of every window, across all processes
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._purge(now)
+            self._conn.commit()
+            totals = dict(self._conn.execute("SELECT name, value FROM rolling_totals"))
+            windows = {}
+            for seconds in self.seconds:
+                rows = self._conn.execute(
+                    """SELECT sentiment, emotion, SUM(count), SUM(compound_sum), SUM(compound_count)
+                       FROM rolling_buckets WHERE start + ? > ?
+                       GROUP BY sentiment, emotion""",
+                    (self.resolution, now - seconds)
+                ).fetchall()
+                sentiments = dict.fromkeys(SENTIMENT_LABELS, 0)
+                emotions = {}
+                compound_sum, compound_count = 0.0, 0
+                for sentiment, emotion, count, bucket_sum, bucket_count in rows:
+                    sentiments[sentiment] += count
+                    if emotion:
+                        emotions[emotion] = emotions.get(emotion, 0) + count
+                    compound_sum += bucket_sum
+                    compound_count += bucket_count
+                windows[f'{seconds}s'] = window_state(seconds, sentiments, compound_sum,
+                                                      compound_count, emotions)
+        return {
+            'total_texts': int(totals['total']),
+            'uptime_seconds': round(now - totals['started'], 1),
+            'windows': windows,
+        }
+    
+    def reopen(self):
+        """
+        Open a fresh database connection, e.g. in a forked worker process
+        """
+        with self._lock:
+            self._conn = self._connect()
+    
+    def close(self):
+        """
+        Close the underlying database
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def open_rolling_aggregator(path=None, windows=(60, 300, 3600)):
+    """
+    SQLite-backed aggregator shared by processes when a path is given,
+    otherwise one counting this process only
+    """
+    if path:
+        return SQLiteRollingAggregator(path, windows=windows)
+    return RollingSentimentAggregator(windows=windows)
@@ -0,0 +1,98 @@
+import math
+import re
+
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+
+class TextScores:
+    def __init__(self, text, analyzer):
+        """
+        Per-text view that runs VADER and TextBlob at most once, and only
+        when something asks for their output
+        """
+        self.text = text
+        self.analyzer = analyzer
+        self._vader = None
+        self._blob = None
+    
+    def vader(self):
+        """
+        VADER neg/neu/pos/compound scores
+        """
+        if self._vader is None:
+            self._vader = self.analyzer.sia.polarity_scores(self.text)
+        return self._vader
+    
+    def blob(self):
+        """
+        TextBlob (polarity, subjectivity)
+        """
+        if self._blob is None:
+            from textblob import TextBlob
+            self._blob = TextBlob(self.text).sentiment
+        return self._blob
+
+
+class VaderEngine:
+    """Label from the VADER compound score"""
+    name = 'vader'
+    fields = ('vader_scores',)
+    
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+    
+    def compound(self, scores):
+        return scores.vader()['compound']
+
+
+class TextBlobEngine:
+    """Label from the TextBlob polarity"""
+    name = 'textblob'
+    fields = ('polarity', 'subjectivity')
+    
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+    
+    def compound(self, scores):
+        return scores.blob().polarity
+
+
+class CombinedEngine(VaderEngine):
+    """Label from VADER, with TextBlob polarity/subjectivity reported too"""
+    name = 'both'
+    fields = ('polarity', 'subjectivity', 'vader_scores')
+
+
+class LinearEngine:
+    """Bag-of-words linear model: tanh(bias + sum of word weights)"""
+    name = 'linear'
+    fields = ()
+    
+    def __init__(self, analyzer, weights=None, bias=0.0):
+        """
+        weights maps lowercase words to their contribution; by default the
+        VADER lexicon valences scaled to [-1, 1], built on first use so that
+        creating the engine does not load NLTK
+        """
+        self.analyzer = analyzer
+        self._weights = weights
+        self.bias = bias
+    
+    @property
+    def weights(self):
+        """Word weights, built from the VADER lexicon on first use"""
+        if self._weights is None:
+            self._weights = {word: valence / 4 for word, valence in self.analyzer.sia.lexicon.items()}
+        return self._weights
+    
+    def compound(self, scores):
+        weights = self.weights
+        total = self.bias + sum(weights.get(word, 0.0)
+                                for word in WORD_PATTERN.findall(scores.text.lower()))
+        return math.tanh(total)
+
+
+ENGINES = {
+    engine.name: engine
+    for engine in (VaderEngine, TextBlobEngine, CombinedEngine, LinearEngine)
+}
@@ -1,21 +1,85 @@
-import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from textblob import TextBlob
-from nltk.sentiment import SentimentIntensityAnalyzer
+import os
+import time
+import threading
+import multiprocessing
+from collections import Counter, deque
+from itertools import islice
 from datetime import datetime
+from emotion_matcher import EmotionMatcher
+from preprocessing import TextPreprocessor
+from scoring_engines import ENGINES, TextScores
+from result_cache import ResultCache
+from compact_result import CompactResult, ResultBatch, Sentiment, EMOTION_ICONS, NAN
+
+# Bundled NLTK data (filled by fetch_nltk_data.py), searched before the defaults
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+
+# (download names, resource paths) per NLTK dependency; any one path will do.
+# punkt_tab replaced punkt in NLTK 3.9.
+NLTK_RESOURCES = [
+    (('vader_lexicon',), ('sentiment/vader_lexicon.zip',)),
+    (('punkt_tab', 'punkt'), ('tokenizers/punkt_tab', 'tokenizers/punkt')),
+    (('stopwords',), ('corpora/stopwords',)),
+]
+
+# Every field analyze_sentiment can return, in result order
+RESULT_FIELDS = (
+    'sentiment', 'sentiment_icon', 'color', 'confidence', 'polarity',
+    'subjectivity', 'emotion', 'emotion_icon', 'processed_text', 'word_count',
+    'char_count', 'vader_scores', 'timestamp', 'text_preview'
+)
+
+# Fields every engine returns by default; engines add their own scores
+BASE_FIELDS = tuple(f for f in RESULT_FIELDS if f not in ('polarity', 'subjectivity', 'vader_scores'))
+
+# Fields that need the engine's compound score
+LABEL_FIELDS = {'sentiment', 'sentiment_icon', 'color', 'confidence'}
+
+# Fields that depend on the exact text or call time, refreshed on cache hits
+PER_CALL_FIELDS = ('char_count', 'timestamp', 'text_preview')
+
+# Analyzer owned by each worker process of analyze_parallel
+_worker_analyzer = None
+
+
+def _init_worker(config, cache_config=None):
+    """Build the worker's analyzer and load its lexicons once per process"""
+    global _worker_analyzer
+    cache = ResultCache(**cache_config) if cache_config else None
+    _worker_analyzer = SentimentAnalyzer(cache=cache, **config)
+    _worker_analyzer.warm_up()
+
+
+def _analyze_chunk(texts):
+    """Analyze one chunk of texts inside a worker process"""
+    return [_worker_analyzer.analyze_sentiment(text) for text in texts]
+
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, emotion_keywords=None, fast_tokenizer=False, engine='both', cache=None,
+                 offline=None):
         """
         Initialize the sentiment analyzer with NLTK's VADER and TextBlob
-        """
-        # Download required NLTK data
-        self.download_nltk_data()
+        emotion_keywords optionally replaces the built-in emotion lexicon
+        ({emotion: [keyword or phrase, ...]}); fast_tokenizer splits
+        preprocessed text on whitespace instead of using word_tokenize
+        (faster, but processed_text can differ slightly);
+        engine is the default scoring engine ('vader', 'textblob', 'both'
+        or 'linear', or an engine instance); cache is an optional
+        ResultCache consulted before analyzing a text; offline (default:
+        the SENTIMENT_OFFLINE environment variable) never downloads NLTK
+        data and only uses installed or bundled resources
         
-        self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+        NLTK resources are loaded lazily, on first use or by warm_up()
+        """
+        if offline is None:
+            offline = os.environ.get('SENTIMENT_OFFLINE', '').lower() in ('1', 'true', 'yes')
+        self.offline = offline
+        self.fast_tokenizer = fast_tokenizer
+        self._sia = None
+        self._stop_words = None
+        self._preprocessor = None
+        self._load_lock = threading.Lock()
         
         # Emotion keywords dictionary
         self.emotion_keywords = {
@@ -30,116 +94,203 @@ class SentimentAnalyzer:
             'surprised': ['surprised', 'shocked', 'amazed', 'astonished'],
             'neutral': ['okay', 'fine', 'alright', 'average', 'normal']
         }
+        if emotion_keywords is not None:
+            self.emotion_keywords = emotion_keywords
+        self.emotion_matcher = EmotionMatcher(self.emotion_keywords)
+        
+        self.cache = cache
+        self._batch_scorer = None
+        self._engines = {}
+        self.engine = self.get_engine(engine)
+    
+    @property
+    def sia(self):
+        """VADER analyzer, loaded on first use"""
+        if self._sia is None:
+            self._load_resources()
+        return self._sia
+    
+    @property
+    def stop_words(self):
+        """English stopwords, loaded on first use"""
+        if self._sia is None:
+            self._load_resources()
+        return self._stop_words
+    
+    @property
+    def preprocessor(self):
+        """Text preprocessor, built on first use"""
+        if self._sia is None:
+            self._load_resources()
+        return self._preprocessor
+    
+    @property
+    def is_loaded(self):
+        """Whether the NLTK resources have been loaded"""
+        return self._sia is not None
+    
+    def _load_resources(self):
+        """
+        Load the NLTK resources exactly once, even with concurrent callers
+        """
+        with self._load_lock:
+            if self._sia is not None:
+                return
+            self.download_nltk_data()
+            
+            from nltk.corpus import stopwords
+            from nltk.sentiment import SentimentIntensityAnalyzer
+            
+            self._stop_words = set(stopwords.words('english'))
+            self._preprocessor = TextPreprocessor(self._stop_words, self.fast_tokenizer)
+            # Assigned last: a loaded VADER means everything else is ready
+            self._sia = SentimentIntensityAnalyzer()
     
     def download_nltk_data(self):
-        """Download required NLTK datasets"""
-        try:
-            nltk.data.find('sentiment/vader_lexicon.zip')
-        except LookupError:
-            nltk.download('vader_lexicon', quiet=True)
+        """Download required NLTK datasets (offline: only check for them)"""
+        import nltk
         
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
+        if os.path.isdir(NLTK_DATA_DIR) and NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        
+        missing = []
+        for names, paths in NLTK_RESOURCES:
+            if not any(self._nltk_has(nltk, path) for path in paths):
+                missing.append(names)
+        
+        if missing and self.offline:
+            raise LookupError(
+                "Offline mode: NLTK resources not found: "
+                f"{', '.join(names[0] for names in missing)}. "
+                "Run 'python fetch_nltk_data.py' to bundle them."
+            )
         
+        for names in missing:
+            for name in names:
+                nltk.download(name, quiet=True)
+    
+    @staticmethod
+    def _nltk_has(nltk, path):
         try:
-            nltk.data.find('corpora/stopwords')
+            nltk.data.find(path)
+            return True
         except LookupError:
-            nltk.download('stopwords', quiet=True)
+            return False
+    
+    def warm_up(self):
+        """
+        Load every resource and run one analysis so the first real request
+        pays no start-up cost
+        Returns: Seconds spent
+        """
+        start = time.perf_counter()
+        self._load_resources()
+        self.analyze_sentiment("Warm-up: a genuinely great, not bad product!")
+        return time.perf_counter() - start
     
     def preprocess_text(self, text):
         """
-        Clean and preprocess the text
+        Clean and preprocess the text: lowercase, strip URLs, mentions,
+        hashtags and non-letters, tokenize and drop stopwords/short words
         """
-        if not text:
-            return ""
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove URLs
-        text = re.sub(r'https?://\S+|www\.\S+', '', text)
-        
-        # Remove mentions and hashtags
-        text = re.sub(r'@\w+|#\w+', '', text)
-        
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and short words
-        tokens = [word for word in tokens if word not in self.stop_words and len(word) > 2]
-        
-        return ' '.join(tokens)
+        return self.preprocessor(text)
     
-    def analyze_sentiment(self, text):
+    def get_engine(self, engine=None):
+        """
+        Resolve an engine name (or instance) to a scoring engine
+        Engines are created on first use and then reused
+        """
+        if engine is None:
+            return self.engine
+        if not isinstance(engine, str):
+            return engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown scoring engine '{engine}'. "
+                             f"Choose from: {', '.join(ENGINES)}")
+        if engine not in self._engines:
+            self._engines[engine] = ENGINES[engine](self)
+        return self._engines[engine]
+    
+    def analyze_sentiment(self, text, engine=None, fields=None):
         """
         Analyze sentiment of the input text
+        engine selects the scoring engine for this call; fields limits the
+        result to those keys, and only the work they need is done (e.g.
+        fields=['sentiment'] with the 'vader' engine skips TextBlob,
+        emotion detection and preprocessing)
         Returns: Dictionary with sentiment scores and classification
         """
+        engine = self.get_engine(engine)
+        if fields is None:
+            fields = RESULT_FIELDS if engine.name == 'both' else BASE_FIELDS + engine.fields
+        unknown = set(fields) - set(RESULT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown result fields: {', '.join(sorted(unknown))}")
+        
         if not text or text.strip() == '':
-            return self._get_empty_result()
-        
-        # Preprocess text
-        processed_text = self.preprocess_text(text)
-        
-        # Analyze with VADER
-        vader_scores = self.sia.polarity_scores(text)
-        
-        # Analyze with TextBlob
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-        
-        # Determine sentiment based on compound score
-        compound_score = vader_scores['compound']
-        
-        if compound_score >= 0.05:
-            sentiment = 'Positive'
-            confidence = compound_score
-            sentiment_icon = '😊'
-            color = 'success'
-        elif compound_score <= -0.05:
-            sentiment = 'Negative'
-            confidence = abs(compound_score)
-            sentiment_icon = '😠'
-            color = 'danger'
-        else:
-            sentiment = 'Neutral'
-            confidence = abs(compound_score)
-            sentiment_icon = '😐'
-            color = 'info'
-        
-        # Detect emotion
-        emotion, emotion_icon = self.detect_emotion(text)
-        
-        # Calculate text statistics
-        word_count = len(text.split())
-        char_count = len(text)
-        
-        # Prepare result
-        result = {
-            'sentiment': sentiment,
-            'sentiment_icon': sentiment_icon,
-            'color': color,
-            'confidence': round(confidence * 100, 2),
-            'polarity': round(polarity, 3),
-            'subjectivity': round(subjectivity, 3),
-            'emotion': emotion,
-            'emotion_icon': emotion_icon,
-            'processed_text': processed_text,
-            'word_count': word_count,
-            'char_count': char_count,
-            'vader_scores': vader_scores,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'text_preview': (text[:200] + '...') if len(text) > 200 else text
-        }
+            empty = self._get_empty_result()
+            return {field: empty[field] for field in RESULT_FIELDS if field in fields}
+        
+        if self.cache is None:
+            return self._compute_result(text, engine, fields)
+        
+        # Near-identical texts share one cached analysis
+        key = self.cache.key(text, engine.name, [f for f in RESULT_FIELDS if f in fields])
+        result = self.cache.get(key)
+        if result is None:
+            result = self._compute_result(text, engine, fields)
+            self.cache.set(key, result)
+            return result
         
+        for field in PER_CALL_FIELDS:
+            if field in result:
+                result[field] = self._compute_result(text, engine, (field,))[field]
         return result
     
+    def _compute_result(self, text, engine, fields):
+        """
+        Run the analysis steps needed for the requested fields
+        """
+        scores = TextScores(text, self)
+        result = {}
+        
+        if LABEL_FIELDS & set(fields):
+            # Determine sentiment based on the engine's compound score
+            compound_score = engine.compound(scores)
+            sentiment = Sentiment.from_compound(compound_score)
+            
+            result.update({
+                'sentiment': sentiment.label,
+                'sentiment_icon': sentiment.icon,
+                'color': sentiment.color,
+                'confidence': round(abs(compound_score) * 100, 2)
+            })
+        
+        for field in RESULT_FIELDS:
+            if field not in fields or field in result:
+                continue
+            if field == 'polarity':
+                result[field] = round(scores.blob().polarity, 3)
+            elif field == 'subjectivity':
+                result[field] = round(scores.blob().subjectivity, 3)
+            elif field in ('emotion', 'emotion_icon'):
+                result['emotion'], result['emotion_icon'] = self.detect_emotion(text)
+            elif field == 'processed_text':
+                result[field] = self.preprocess_text(text)
+            elif field == 'word_count':
+                result[field] = len(text.split())
+            elif field == 'char_count':
+                result[field] = len(text)
+            elif field == 'vader_scores':
+                result[field] = scores.vader()
+            elif field == 'timestamp':
+                result[field] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            elif field == 'text_preview':
+                result[field] = (text[:200] + '...') if len(text) > 200 else text
+        
+        # Keep result keys in the documented order
+        return {field: result[field] for field in RESULT_FIELDS if field in fields}
+    
     def _get_empty_result(self):
         """Return empty result structure"""
         return {
@@ -161,69 +312,159 @@ class SentimentAnalyzer:
     
     def detect_emotion(self, text):
         """
-        Detect specific emotion from text using keyword matching
+        Detect specific emotion from text using whole-word keyword matching
+        """
+        # Emotion with the most distinct keywords, found in a single pass
+        emotion = (self.emotion_matcher.detect(text) or 'neutral').capitalize()
+        return emotion, EMOTION_ICONS.get(emotion, '😐')
+    
+    def analyze_compact(self, text, engine=None):
+        """
+        Analyze text into a memory-light CompactResult (scores and
+        enum-coded labels only); render it with to_dict() when displayed
         """
-        text_lower = text.lower()
-        emotion_scores = {}
+        engine = self.get_engine(engine)
+        if not text or text.strip() == '':
+            return CompactResult(Sentiment.NEUTRAL, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
         
-        # Count emotion keyword occurrences
-        for emotion, keywords in self.emotion_keywords.items():
-            count = sum(1 for keyword in keywords if keyword in text_lower)
-            if count > 0:
-                emotion_scores[emotion] = count
+        scores = TextScores(text, self)
+        compound = engine.compound(scores)
+        neg = neu = pos = polarity = subjectivity = NAN
+        if 'vader_scores' in engine.fields:
+            vader = scores.vader()
+            neg, neu, pos = vader['neg'], vader['neu'], vader['pos']
+        if 'polarity' in engine.fields:
+            polarity, subjectivity = scores.blob()
         
-        # Return emotion with highest count
-        if emotion_scores:
-            emotion = max(emotion_scores.items(), key=lambda x: x[1])[0]
-        else:
-            emotion = 'neutral'
-        
-        # Get emotion icon
-        emotion_icons = {
-            'happy': '😊',
-            'sad': '😢',
-            'angry': '😠',
-            'fearful': '😨',
-            'surprised': '😲',
-            'neutral': '😐'
-        }
+        return CompactResult(
+            Sentiment.from_compound(compound),
+            round(abs(compound) * 100, 2),
+            compound, neg, neu, pos, polarity, subjectivity,
+            self.detect_emotion(text)[0],
+            len(text.split()),
+            len(text)
+        )
+    
+    def score_batch(self, texts, engine=None):
+        """
+        Score many texts at once with the vectorized batch scorer
+        engine picks the label like in analyze_sentiment (default: this
+        analyzer's engine)
+        Returns: DataFrame with sentiment, confidence, VADER scores, polarity,
+        subjectivity, emotion, word_count and char_count columns
+        """
+        if self._batch_scorer is None:
+            # Imported here: pandas is only needed for batch scoring
+            from batch_scorer import BatchSentimentScorer
+            self._batch_scorer = BatchSentimentScorer(self)
+        return self._batch_scorer.score(texts, engine=self.get_engine(engine))
+    
+    def analyze_parallel(self, texts, processes=None, chunk_size=256):
+        """
+        Analyze texts across a pool of worker processes
+        Each worker builds its own analyzer once at startup, with this
+        analyzer's emotion keywords, tokenizer, offline setting and default
+        engine (a registered engine, by name), sharing its cache if it has a
+        SQLite path; texts are sent in
+        chunks and results are yielded one per text, in input order. At most
+        two chunks per worker are in flight, so texts can be a stream.
+        """
+        processes = processes or os.cpu_count() or 1
+        texts = iter(texts)
+        chunks = iter(lambda: list(islice(texts, chunk_size)), [])
+        pending = deque()
         
-        return emotion.capitalize(), emotion_icons.get(emotion, '😐')
+        config = {
+            'emotion_keywords': self.emotion_keywords,
+            'fast_tokenizer': self.fast_tokenizer,
+            'engine': self.engine.name,
+            'offline': self.offline,
+        }
+        # Workers share the cache when it is backed by SQLite
+        cache_config = None
+        if self.cache is not None and self.cache.path:
+            cache_config = {'max_entries': self.cache.max_entries, 'ttl': self.cache.ttl,
+                            'path': self.cache.path}
+        with multiprocessing.Pool(processes, initializer=_init_worker,
+                                  initargs=(config, cache_config)) as pool:
+            for chunk in chunks:
+                pending.append(pool.apply_async(_analyze_chunk, (chunk,)))
+                if len(pending) >= processes * 2:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
     
-    def analyze_multiple(self, texts):
+    def analyze_multiple(self, texts, columnar=False, processes=None, compact=False):
         """
         Analyze multiple texts and return aggregated results
+        With columnar=True the texts are scored in one vectorized pass and
+        individual_results is a DataFrame instead of a list of dicts.
+        With compact=True individual_results is a ResultBatch.
+        With processes > 1 they are analyzed by analyze_parallel.
         """
-        results = []
-        for text in texts:
-            if text and text.strip():
-                results.append(self.analyze_sentiment(text))
-        
-        # Calculate overall statistics
-        if results:
-            sentiments = [r['sentiment'] for r in results]
-            sentiment_counts = {
-                'Positive': sentiments.count('Positive'),
-                'Negative': sentiments.count('Negative'),
-                'Neutral': sentiments.count('Neutral')
-            }
-            
-            # Determine overall sentiment
-            overall_sentiment = max(sentiment_counts.items(), key=lambda x: x[1])[0]
-            
-            # Calculate percentages
-            total = len(results)
-            percentages = {
-                sentiment: round((count / total) * 100, 2)
-                for sentiment, count in sentiment_counts.items()
-            }
-            
-            return {
-                'overall_sentiment': overall_sentiment,
-                'total_reviews': total,
-                'sentiment_distribution': sentiment_counts,
-                'percentages': percentages,
-                'individual_results': results
-            }
-        
-        return None
+        if columnar:
+            return self._analyze_columnar(texts)
+        
+        texts = [text for text in texts if text and text.strip()]
+        if compact:
+            return self._analyze_compact_batch(texts)
+        if processes and processes > 1:
+            results = list(self.analyze_parallel(texts, processes))
+        else:
+            results = [self.analyze_sentiment(text) for text in texts]
+        
+        if not results:
+            return None
+        counts = Counter(r['sentiment'] for r in results)
+        return self._summarize(counts, results)
+    
+    def _analyze_columnar(self, texts):
+        """
+        Aggregate results for analyze_multiple(columnar=True)
+        """
+        texts = [text for text in texts if text and text.strip()]
+        if not texts:
+            return None
+        
+        results = self.score_batch(texts)
+        return self._summarize(results['sentiment'].value_counts(), results)
+    
+    def _analyze_compact_batch(self, texts):
+        """
+        Aggregate results for analyze_multiple(compact=True)
+        """
+        if not texts:
+            return None
+        
+        results = ResultBatch(capacity=len(texts))
+        results.extend(self.analyze_compact(text) for text in texts)
+        return self._summarize(results.sentiment_counts(), results)
+    
+    @staticmethod
+    def _summarize(counts, results):
+        """
+        Aggregate statistics of analyze_multiple over one batch of results
+        counts maps each sentiment label to its number of results
+        """
+        sentiment_counts = {
+            sentiment: int(counts.get(sentiment, 0))
+            for sentiment in ('Positive', 'Negative', 'Neutral')
+        }
+        
+        # Determine overall sentiment
+        overall_sentiment = max(sentiment_counts.items(), key=lambda x: x[1])[0]
+        
+        # Calculate percentages
+        total = len(results)
+        percentages = {
+            sentiment: round((count / total) * 100, 2)
+            for sentiment, count in sentiment_counts.items()
+        }
+        
+        return {
+            'overall_sentiment': overall_sentiment,
+            'total_reviews': total,
+            'sentiment_distribution': sentiment_counts,
+            'percentages': percentages,
+            'individual_results': results
+        }
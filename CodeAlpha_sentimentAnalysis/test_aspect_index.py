@@ -0,0 +1,88 @@
+import pytest
+from aspect_index import AspectIndex
+from sentiment_analyzer import SentimentAnalyzer
+
+REVIEWS = [
+    "Delivery was terribly late. The quality is great!",
+    "Customer service never responded. Awful support.",
+    "Nice colour.",
+]
+
+MORE_REVIEWS = [
+    "The package arrived on time and the price is fair.",
+    "Shipping was slow and the courier was rude.",
+]
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer()
+
+
+@pytest.fixture
+def index(analyzer):
+    index = AspectIndex(analyzer)
+    index.add_documents(REVIEWS)
+    return index
+
+
+def test_splits_sentences_with_offsets():
+    text = "Great price! Late delivery.\nBroken box"
+    spans = list(AspectIndex.sentences(text))
+    assert [text[start:end] for start, end in spans] == ["Great price!", "Late delivery.", "Broken box"]
+
+
+def test_indexes_only_aspect_mentions(index, analyzer):
+    assert len(index) == 4
+    sentences = [span['sentence'] for span in index.query()]
+    assert "Nice colour." not in sentences
+
+    for span in index.query():
+        compound = analyzer.sia.polarity_scores(span['sentence'])['compound']
+        assert span['compound'] == pytest.approx(compound, abs=1e-4)
+
+
+def test_queries_by_aspect_sentiment_and_term(index):
+    negative_delivery = index.query('delivery', 'Negative')
+    assert [(span['doc_id'], span['sentence']) for span in negative_delivery] == [
+        (0, "Delivery was terribly late.")
+    ]
+    assert [span['sentence'] for span in index.query('quality', 'positive')] == ["The quality is great!"]
+    assert len(index.query('support')) == 2
+    assert [span['sentence'] for span in index.query(term='Customer Service')] == [
+        "Customer service never responded."
+    ]
+    assert index.query('price') == []
+
+
+def test_rejects_unknown_aspect_and_sentiment(index):
+    with pytest.raises(ValueError):
+        index.query('colour')
+    with pytest.raises(ValueError):
+        index.query('delivery', 'Angry')
+
+
+def test_incremental_add_extends_existing_postings(index):
+    before = {name: stats['mentions'] for name, stats in index.summary().items()}
+    added = index.add_documents(MORE_REVIEWS, doc_ids=['r4', 'r5'])
+    assert added == 2
+    assert len(index) == 6
+
+    summary = index.summary()
+    assert summary['delivery']['mentions'] == before['delivery'] + 2
+    assert summary['price']['mentions'] == before['price'] + 1
+    assert summary['quality']['mentions'] == before['quality']
+
+    # earlier spans keep their ids; new documents carry their own ids
+    assert index.query('delivery', 'Negative')[0]['doc_id'] == 0
+    assert [span['doc_id'] for span in index.query('delivery')] == [0, 'r4', 'r5']
+    assert index.add_documents(["Nothing relevant here."]) == 0
+    assert index.doc_ids[-1] == 5
+
+
+def test_matches_indexing_everything_at_once(analyzer, index):
+    index.add_documents(MORE_REVIEWS)
+    whole = AspectIndex(analyzer)
+    whole.add_documents(REVIEWS + MORE_REVIEWS)
+    assert index.summary() == whole.summary()
+    assert index.query() == whole.query()
@@ -0,0 +1,110 @@
+import random
+import pytest
+from textblob import TextBlob
+import batch_scorer
+from sentiment_analyzer import SentimentAnalyzer
+from utils import TextUtils
+
+# Texts that exercise VADER's and TextBlob's special-case rules
+RULE_TEXTS = [
+    "The battery life kind of sucks.",
+    "This phone is the bomb!",
+    "This is the least useful thing",
+    "At least it is good", "at the very least it works",
+    "I never so loved it", "It is never this good",
+    "Yeah right, great job", "That movie was a kiss of death",
+    "Good good good but bad", "GOOD bad", "NOT bad at all",
+    "It was not a good day", "Really not good", "not very good", "very very good",
+    "Very :) good", ": ) nice", "( ! ) great", "Great (!)",
+    "good !!!!!!!!!!", "Is it good??", "Is it good????", "good. good!",
+    "don't like it", "I don't hate it", "It isn't bad, it's ok",
+    "e.g. U.S. Mr. Smith is nice...", "'good' \"bad\"", "!!!", "a", "kind of", "kind",
+    "", "   ", "\n\t",
+]
+
+WORDS = ("the a phone battery life is was it and i my good great bad terrible love hate "
+         "not never no very really extremely kind of least but so this sucks :) :( <3 !").split()
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(0, 20)):
+            word = rng.choice(WORDS)
+            if rng.random() < 0.1:
+                word = word.upper()
+            if rng.random() < 0.2:
+                word += rng.choice(['!', '.', ',', '?', '...', "'", ')'])
+            words.append(word)
+        texts.append(' '.join(words))
+    return texts
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer()
+
+
+@pytest.mark.parametrize('texts', [
+    RULE_TEXTS,
+    TextUtils.get_sample_texts(),
+    random_texts(500),
+], ids=['rules', 'samples', 'random'])
+def test_matches_per_text_analysis(analyzer, texts):
+    batch = analyzer.score_batch(texts)
+    assert len(batch) == len(texts)
+
+    for text, (_, row) in zip(texts, batch.iterrows()):
+        vader = analyzer.sia.polarity_scores(text)
+        for key in ('compound', 'neg', 'neu', 'pos'):
+            assert row[key] == pytest.approx(vader[key], abs=1e-9), (text, key)
+
+        result = analyzer.analyze_sentiment(text)
+        for key in ('confidence', 'polarity', 'subjectivity'):
+            assert row[key] == pytest.approx(result[key]), (text, key)
+        for key in ('sentiment', 'emotion', 'word_count', 'char_count'):
+            assert row[key] == result[key], (text, key)
+
+
+def test_polarity_matches_textblob(analyzer):
+    texts = random_texts(300, seed=1)
+    batch = analyzer.score_batch(texts)
+    for text, polarity, subjectivity in zip(texts, batch['polarity'], batch['subjectivity']):
+        blob = TextBlob(text).sentiment
+        assert polarity == pytest.approx(round(blob.polarity, 3)), text
+        assert subjectivity == pytest.approx(round(blob.subjectivity, 3)), text
+
+
+def test_duplicates_and_custom_emotions():
+    analyzer = SentimentAnalyzer(emotion_keywords={'delight': ['good'], 'gloom': ['bad', 'sad']})
+    texts = ["good", "bad and sad but good", "good", None, "meh"]
+    batch = analyzer.score_batch(texts)
+    assert batch['emotion'].tolist() == ['Delight', 'Gloom', 'Delight', 'Neutral', 'Neutral']
+    assert batch.iloc[0].equals(batch.iloc[2])
+
+
+@pytest.mark.parametrize('engine', ['vader', 'textblob', 'linear'])
+def test_labels_follow_engine(engine):
+    analyzer = SentimentAnalyzer(engine=engine)
+    texts = RULE_TEXTS + random_texts(200, seed=2)
+    batch = analyzer.score_batch(texts)
+    for text, (_, row) in zip(texts, batch.iterrows()):
+        result = analyzer.analyze_sentiment(text)
+        assert row['sentiment'] == result['sentiment'], text
+        assert row['confidence'] == pytest.approx(result['confidence']), text
+
+
+@pytest.mark.parametrize('engine', ['both', 'textblob', 'linear'])
+def test_per_text_fallback_matches(analyzer, monkeypatch, engine):
+    texts = RULE_TEXTS + random_texts(100, seed=3) + RULE_TEXTS[:5]
+    vectorized = analyzer.score_batch(texts, engine=engine)
+    monkeypatch.setattr(batch_scorer, 'VECTORIZED', False)
+    fallback = batch_scorer.BatchSentimentScorer(analyzer).score(texts, engine=analyzer.get_engine(engine))
+    assert list(fallback.columns) == list(vectorized.columns)
+    assert (fallback['sentiment'] == vectorized['sentiment']).all()
+    assert (fallback['emotion'].astype(str) == vectorized['emotion'].astype(str)).all()
+    for column in ('confidence', 'compound', 'neg', 'neu', 'pos', 'polarity', 'subjectivity',
+                   'word_count', 'char_count'):
+        assert fallback[column].to_numpy() == pytest.approx(vectorized[column].to_numpy()), column
@@ -0,0 +1,58 @@
+import pytest
+from phrase_matcher import PhraseMatcher
+from emotion_matcher import EmotionMatcher
+from sentiment_analyzer import SentimentAnalyzer
+
+LEXICON = {
+    'angry': ['mad', 'furious', 'fed up'],
+    'happy': ['glad', 'over the moon'],
+    'sad': ["can't stop crying", 'down'],
+}
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return PhraseMatcher(LEXICON)
+
+
+@pytest.mark.parametrize('text', [
+    "I made it myself",
+    "Nomad life, madness and madam",
+    "The gladiator went downtown",
+    "I was fed, then up all night",
+])
+def test_only_whole_words_match(matcher, text):
+    assert matcher.match(text) == set()
+    assert matcher.detect(text) is None
+
+
+def test_words_match_across_case_and_punctuation(matcher):
+    assert matcher.match("MAD! So mad, really (mad).") == {('mad',)}
+    assert matcher.match("I'm glad... GLAD") == {('glad',)}
+
+
+def test_multi_word_phrases(matcher):
+    assert matcher.match("Honestly I am fed up with it") == {('fed', 'up')}
+    assert matcher.match("I'm over the moon and glad") == {('over', 'the', 'moon'), ('glad',)}
+    assert matcher.match("I can't stop crying") == {("can't", 'stop', 'crying')}
+    assert matcher.match("I can not stop crying") == set()
+
+
+def test_counts_distinct_terms_per_label(matcher):
+    counts = matcher.counts("mad, mad and furious but glad")
+    assert counts == {'angry': 2, 'happy': 1, 'sad': 0}
+
+
+def test_detect_prefers_earliest_label_on_ties(matcher):
+    assert matcher.detect("glad but mad") == 'angry'
+    assert matcher.detect("glad but down and over the moon") == 'happy'
+
+
+def test_emotion_matcher_lists_emotions():
+    assert EmotionMatcher(LEXICON).emotions == ['angry', 'happy', 'sad']
+
+
+def test_analyzer_detects_whole_words_only():
+    analyzer = SentimentAnalyzer(emotion_keywords={'angry': ['mad']})
+    assert analyzer.detect_emotion("I made a cake")[0] == 'Neutral'
+    assert analyzer.detect_emotion("I am so mad")[0] == 'Angry'
@@ -0,0 +1,89 @@
+import pytest
+import result_cache
+from result_cache import ResultCache, normalize_text
+from sentiment_analyzer import SentimentAnalyzer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache.time, 'time', clock.time)
+    return clock
+
+
+def test_key_normalizes_whitespace_but_not_case():
+    assert normalize_text("  Great\n\tphone  ") == "Great phone"
+    assert ResultCache.key("Great  phone") == ResultCache.key(" Great phone\n")
+    assert ResultCache.key("Great phone") != ResultCache.key("GREAT phone")
+    assert ResultCache.key("Great phone", 'vader') != ResultCache.key("Great phone", 'both')
+    assert ResultCache.key("Great phone", fields=['sentiment']) != ResultCache.key("Great phone")
+
+
+def test_evicts_least_recently_used(clock):
+    cache = ResultCache(max_entries=2)
+    cache.set('a', {'n': 1})
+    cache.set('b', {'n': 2})
+    assert cache.get('a') == {'n': 1}
+    cache.set('c', {'n': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1}
+    assert cache.get('c') == {'n': 3}
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(ttl=60)
+    cache.set('a', {'n': 1})
+    clock.now += 60
+    assert cache.get('a') == {'n': 1}
+    clock.now += 1
+    assert cache.get('a') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations'], stats['size']) == (1, 1, 1, 0)
+
+
+def test_returns_copies(clock):
+    cache = ResultCache()
+    result = {'vader_scores': {'compound': 0.5}}
+    cache.set('a', result)
+    result['vader_scores']['compound'] = 0.0
+    cached = cache.get('a')
+    cached['vader_scores']['compound'] = -1.0
+    assert cache.get('a') == {'vader_scores': {'compound': 0.5}}
+
+
+def test_shared_database_survives_processes(clock, tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    writer = ResultCache(path=path, ttl=60)
+    writer.set('a', {'n': 1})
+    writer.close()
+
+    reader = ResultCache(path=path, ttl=60)
+    assert reader.get('a') == {'n': 1}
+    reader.close()
+
+    clock.now += 120
+    expired = ResultCache(path=path, ttl=60)
+    assert expired.get('a') is None
+    expired.close()
+
+
+def test_analyzer_reuses_cached_results():
+    cache = ResultCache(max_entries=10)
+    analyzer = SentimentAnalyzer(cache=cache)
+    first = analyzer.analyze_sentiment("The battery  life is great")
+    second = analyzer.analyze_sentiment("The battery life is great ")
+    assert second['sentiment'] == first['sentiment']
+    assert second['vader_scores'] == first['vader_scores']
+    assert cache.stats()['hits'] == 1
@@ -0,0 +1,104 @@
+import pytest
+import result_store
+from result_store import MemoryResultStore, SQLiteResultStore, open_result_store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_store.time, 'time', clock.time)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path, clock):
+    if request.param == 'memory':
+        yield MemoryResultStore(ttl=60)
+    else:
+        store = SQLiteResultStore(str(tmp_path / 'results.sqlite'), ttl=60)
+        yield store
+        store.close()
+
+
+def test_save_and_load(store):
+    key = store.save({'sentiment': 'Positive', 'scores': [0.1, 0.9]})
+    assert len(key) == 32
+    assert store.load(key) == {'sentiment': 'Positive', 'scores': [0.1, 0.9]}
+    assert store.save({'n': 1}, key='job-1') == 'job-1'
+    assert store.load('job-1') == {'n': 1}
+    assert store.load('unknown') is None
+    assert store.load(None) is None
+
+
+def test_values_are_copies(store):
+    value = {'results': [1, 2]}
+    key = store.save(value)
+    value['results'].append(3)
+    loaded = store.load(key)
+    loaded['results'].clear()
+    assert store.load(key) == {'results': [1, 2]}
+
+
+def test_save_replaces_and_delete_removes(store):
+    store.save({'n': 1}, key='job')
+    store.save({'n': 2}, key='job')
+    assert store.load('job') == {'n': 2}
+    store.delete('job')
+    store.delete('job')
+    assert store.load('job') is None
+
+
+def test_values_expire_after_ttl(store, clock):
+    store.save({'n': 1}, key='job')
+    clock.now += 60
+    assert store.load('job') == {'n': 1}
+    clock.now += 1
+    assert store.load('job') is None
+
+
+def test_memory_store_evicts_least_recently_used(clock):
+    store = MemoryResultStore(max_entries=2, ttl=None)
+    store.save(1, key='a')
+    store.save(2, key='b')
+    store.load('a')
+    store.save(3, key='c')
+    assert [store.load(key) for key in 'abc'] == [1, None, 3]
+
+
+def test_memory_store_without_limit_keeps_everything(clock):
+    store = MemoryResultStore(max_entries=None, ttl=None)
+    for i in range(2500):
+        store.save(i, key=str(i))
+    clock.now += 10 ** 6
+    assert store.load('0') == 0 and store.load('2499') == 2499
+
+
+def test_sqlite_store_is_shared_and_purged(tmp_path, clock):
+    path = str(tmp_path / 'results.sqlite')
+    writer = SQLiteResultStore(path, ttl=60)
+    writer.save({'n': 1}, key='job')
+    reader = SQLiteResultStore(path, ttl=60)
+    assert reader.load('job') == {'n': 1}
+    reader.close()
+
+    clock.now += 120
+    reopened = SQLiteResultStore(path, ttl=60)
+    assert reopened._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+    reopened.close()
+    writer.close()
+
+
+def test_open_result_store(tmp_path):
+    memory = open_result_store(None, max_entries=None)
+    assert isinstance(memory, MemoryResultStore) and memory.max_entries is None
+    sqlite = open_result_store(str(tmp_path / 'results.sqlite'), ttl=10)
+    assert isinstance(sqlite, SQLiteResultStore) and sqlite.ttl == 10
+    sqlite.close()
@@ -0,0 +1,91 @@
+import pytest
+from compact_result import CompactResult, Sentiment
+from rolling_stats import (RollingSentimentAggregator, SQLiteRollingAggregator, SlidingWindow,
+                           open_rolling_aggregator, result_fields)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def aggregator(request, tmp_path):
+    if request.param == 'memory':
+        yield RollingSentimentAggregator(windows=(60, 300))
+    else:
+        aggregator = SQLiteRollingAggregator(str(tmp_path / 'rolling.sqlite'), windows=(60, 300))
+        yield aggregator
+        aggregator.close()
+
+
+def test_window_counts_and_expiry():
+    window = SlidingWindow(10)
+    window.add('Positive', 0.5, 'Happy', 100.0)
+    window.add('Negative', -0.5, 'Angry', 105.0)
+    window.add('Positive', None, None, 105.5)
+
+    state = window.state(106.0)
+    assert state['count'] == 3
+    assert state['sentiment_counts'] == {'Positive': 2, 'Negative': 1, 'Neutral': 0}
+    assert state['mean_compound'] == 0.0
+    assert state['emotion_distribution'] == {'Happy': 33.33, 'Angry': 33.33}
+
+    state = window.state(111.0)
+    assert state['count'] == 2
+    assert state['mean_compound'] == -0.5
+    assert window.state(200.0)['count'] == 0
+    assert window.emotion_counts == {}
+
+
+def test_windows_cover_their_own_spans(aggregator):
+    for second in range(0, 240, 10):
+        aggregator.add('Positive' if second < 180 else 'Negative', 0.2, 'Happy', timestamp=1000.0 + second)
+
+    windows = aggregator.state(now=1240.0)['windows']
+    assert windows['60s']['sentiment_counts'] == {'Positive': 0, 'Negative': 6, 'Neutral': 0}
+    assert windows['60s']['overall_sentiment'] == 'Negative'
+    assert windows['300s']['count'] == 24
+    assert windows['300s']['percentages']['Positive'] == 75.0
+    assert windows['300s']['mean_compound'] == 0.2
+    assert aggregator.state(now=2000.0)['windows']['300s']['count'] == 0
+    assert aggregator.state(now=2000.0)['total_texts'] == 24
+
+
+def test_rejects_unknown_sentiment(aggregator):
+    with pytest.raises(ValueError):
+        aggregator.add('Happy')
+
+
+def test_sqlite_windows_are_shared(tmp_path):
+    path = str(tmp_path / 'rolling.sqlite')
+    first = SQLiteRollingAggregator(path, windows=(60,))
+    second = SQLiteRollingAggregator(path, windows=(60,))
+    first.add('Positive', 0.4, timestamp=1000.0)
+    second.add('Positive', 0.2, timestamp=1000.5)
+    state = first.state(now=1001.0)
+    assert state['total_texts'] == 2
+    assert state['windows']['60s']['mean_compound'] == 0.3
+    first.close()
+    second.close()
+
+
+def test_only_vader_compounds_are_averaged():
+    vader = CompactResult(Sentiment.POSITIVE, 50.0, 0.5, 0.0, 0.5, 0.5, emotion='Happy')
+    textblob = CompactResult(Sentiment.NEGATIVE, 90.0, -0.9, polarity=-0.9, subjectivity=1.0)
+    result = {'sentiment': 'Neutral', 'emotion': 'Neutral', 'polarity': 0.0}
+
+    assert result_fields(vader) == ('Positive', 0.5, 'Happy')
+    assert result_fields(textblob) == ('Negative', None, 'Neutral')
+    assert result_fields(result) == ('Neutral', None, 'Neutral')
+    assert result_fields({'sentiment': 'Negative', 'vader_scores': {'compound': -0.3}}) == ('Negative', -0.3, None)
+
+    aggregator = RollingSentimentAggregator(windows=(60,))
+    for item in (vader, textblob, result):
+        aggregator.add_result(item, timestamp=1000.0)
+    window = aggregator.state(now=1000.0)['windows']['60s']
+    assert window['count'] == 3
+    assert window['mean_compound'] == 0.5
+
+
+def test_open_rolling_aggregator(tmp_path):
+    assert type(open_rolling_aggregator(None)) is RollingSentimentAggregator
+    shared = open_rolling_aggregator(str(tmp_path / 'rolling.sqlite'), windows=(60,))
+    assert type(shared) is SQLiteRollingAggregator
+    assert list(shared.state()['windows']) == ['60s']
+    shared.close()
@@ -0,0 +1,21 @@
+"""
+Production WSGI entry point
+
+Imports the Flask app, loads every analyzer resource and freezes the
+resulting objects out of the garbage collector, so that with gunicorn's
+preload_app the lexicons live in the master and are shared copy-on-write
+by every forked worker.
+
+    gunicorn -c gunicorn.conf.py
+"""
+
+import gc
+
+from app import app, analyzer
+
+analyzer.warm_up()
+
+# Keep the GC from touching (and so copying) the preloaded objects in workers
+gc.freeze()
+
+application = app